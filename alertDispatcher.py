@@ -0,0 +1,226 @@
+"""
+alertDispatcher.py
+==================
+Background Telegram sender so routes never wait on the Bot API.
+
+AlertManager.send_chart_alert / send_photo_alert only enqueue; a single
+daemon thread drains the queue through the shared pooled HttpClient.
+
+  • Rate limiting: at most one message per chat every TELE_MIN_INTERVAL
+    seconds and TELE_MAX_PER_SEC messages overall (Bot API limits are
+    ~1/s per chat and 30/s per bot).
+  • Retry: 429 honours Telegram's `retry_after`; connection errors and 5xx
+    back off exponentially; other 4xx are logged and dropped.
+  • Bounded backlog: text alerts still waiting for the same chat are
+    coalesced into one message (up to Telegram's 4096 chars); once
+    ALERT_QUEUE_MAXSIZE items are pending the oldest one is dropped.
+  • Pending alerts get up to ALERT_FLUSH_TIMEOUT seconds to go out at
+    interpreter exit.
+
+Configuration (environment, all optional):
+    TELE_API_BASE         Bot API base URL  (default https://api.telegram.org;
+                          point it at a local fake server for testing)
+    ALERT_QUEUE_MAXSIZE   pending alerts kept before dropping    (default 100)
+    TELE_MIN_INTERVAL     seconds between messages to one chat   (default 1.0)
+    TELE_MAX_PER_SEC      messages per second across all chats   (default 25)
+    TELE_RETRIES          attempts after the first failure       (default 3)
+    TELE_BACKOFF          exponential backoff factor in seconds  (default 1.0)
+    ALERT_FLUSH_TIMEOUT   seconds to drain the queue at exit     (default 5)
+
+Usage:
+    from alertDispatcher import get_alert_dispatcher
+    get_alert_dispatcher().send_message(token, chat_id, "SPY Buy signal ...")
+"""
+
+import atexit
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+
+from httpClient import get_http_client
+
+TELEGRAM_MAX_TEXT = 4096
+
+
+class AlertDispatcher:
+    def __init__(self, base_url=None, maxsize=None, min_interval=None, max_per_sec=None,
+                 retries=None, backoff=None, client=None):
+        self.base_url     = (base_url or os.getenv("TELE_API_BASE", "https://api.telegram.org")).rstrip('/')
+        self.maxsize      = maxsize      or int(os.getenv("ALERT_QUEUE_MAXSIZE", 100))
+        self.min_interval = min_interval if min_interval is not None else float(os.getenv("TELE_MIN_INTERVAL", 1.0))
+        self.max_per_sec  = max_per_sec  or float(os.getenv("TELE_MAX_PER_SEC", 25))
+        self.retries      = retries      if retries      is not None else int(os.getenv("TELE_RETRIES", 3))
+        self.backoff      = backoff      if backoff      is not None else float(os.getenv("TELE_BACKOFF", 1.0))
+        self._client      = client
+
+        self._queue     = deque()
+        self._cond      = threading.Condition()
+        self._busy      = False          # worker is sending an item taken off the queue
+        self._closed    = False
+        self._thread    = None
+        self._last_chat = {}             # chat_id -> time.monotonic() of last send
+        self._last_any  = 0.0
+
+        self.sent = self.failed = self.dropped = self.coalesced = 0
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def send_message(self, token, chat_id, text):
+        """Queue a sendMessage; returns False if the dispatcher is closed."""
+        return self._enqueue({'method': 'sendMessage', 'token': token, 'chat_id': chat_id,
+                              'text': str(text)})
+
+    def send_photo(self, token, chat_id, photo, filename="sp.png", caption=""):
+        """Queue a sendPhoto.  `photo` is the PNG bytes (copied by the caller
+        from its buffer, which may be closed as soon as this returns)."""
+        return self._enqueue({'method': 'sendPhoto', 'token': token, 'chat_id': chat_id,
+                              'photo': photo, 'filename': filename, 'caption': caption})
+
+    def pending(self):
+        with self._cond:
+            return len(self._queue) + (1 if self._busy else 0)
+
+    def flush(self, timeout=None):
+        """Block until every queued alert has been handled (sent, failed or
+        dropped).  Returns False if `timeout` expired first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._busy:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout=None):
+        """Drain (up to `timeout`) and stop the worker thread."""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    def _enqueue(self, item):
+        with self._cond:
+            if self._closed:
+                return False
+            if item['method'] == 'sendMessage' and self._coalesce(item):
+                return True
+            if len(self._queue) >= self.maxsize:
+                old = self._queue.popleft()
+                self.dropped += 1
+                print(f"[Telegram] backlog full, dropped oldest {old['method']}")
+            self._queue.append(item)
+            self._start_worker()
+            self._cond.notify_all()
+        return True
+
+    def _coalesce(self, item):
+        # Caller holds the lock.  Append to the newest pending item for the
+        # same chat when it is a text, so a burst of alerts costs one API
+        # call without reordering it around a queued photo.
+        for queued in reversed(self._queue):
+            if queued['chat_id'] != item['chat_id'] or queued['token'] != item['token']:
+                continue
+            if queued['method'] != 'sendMessage':
+                return False
+            merged = f"{queued['text']}\n{item['text']}"
+            if len(merged) > TELEGRAM_MAX_TEXT:
+                return False
+            queued['text'] = merged
+            self.coalesced += 1
+            return True
+        return False
+
+    def _start_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                item = self._queue.popleft()
+                self._busy = True
+            try:
+                self._deliver(item)
+            except Exception as e:          # never let one alert kill the worker
+                self.failed += 1
+                print(f"[Telegram] {item['method']} failed: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def _throttle(self, chat_id):
+        now  = time.monotonic()
+        wait = max(self._last_chat.get(chat_id, 0.0) + self.min_interval,
+                   self._last_any + 1.0 / self.max_per_sec) - now
+        if wait > 0:
+            time.sleep(wait)
+        self._last_any = self._last_chat[chat_id] = time.monotonic()
+
+    def _deliver(self, item):
+        client = self._client or get_http_client()
+        url    = f"{self.base_url}/bot{item['token']}/{item['method']}"
+
+        for attempt in range(self.retries + 1):
+            self._throttle(item['chat_id'])
+            delay = self.backoff * (2 ** attempt)
+            try:
+                if item['method'] == 'sendPhoto':
+                    resp = client.post(url,
+                                       data={"chat_id": item['chat_id'], "caption": item['caption'], "parse_mode": "HTML"},
+                                       files={"photo": (item['filename'], item['photo'], "image/png")})
+                else:
+                    resp = client.post(url, data={"chat_id": item['chat_id'], "text": item['text']})
+            except requests.exceptions.RequestException as e:
+                print(f"[Telegram] {item['method']} attempt {attempt + 1}: {e}")
+            else:
+                if resp.ok:
+                    self.sent += 1
+                    if item['method'] == 'sendPhoto':
+                        print("[Telegram] ✓ Photo sent successfully")
+                    return
+                if resp.status_code == 429:
+                    try:
+                        delay = float(resp.json().get("parameters", {}).get("retry_after", delay))
+                    except ValueError:
+                        pass
+                elif resp.status_code < 500:
+                    self.failed += 1
+                    print(f"[Telegram] {item['method']} rejected: {resp.status_code} {resp.text[:200]}")
+                    return
+                print(f"[Telegram] {item['method']} attempt {attempt + 1}: HTTP {resp.status_code}")
+            if attempt < self.retries:
+                time.sleep(delay)
+
+        self.failed += 1
+        print(f"[Telegram] {item['method']} gave up after {self.retries + 1} attempts")
+
+
+_dispatcher      = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_alert_dispatcher():
+    """Process-wide shared AlertDispatcher (drained at interpreter exit)."""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = AlertDispatcher()
+                atexit.register(_dispatcher.close, float(os.getenv("ALERT_FLUSH_TIMEOUT", 5)))
+    return _dispatcher
@@ -7,6 +7,8 @@ from zoneinfo import ZoneInfo
 import os
 import io
 import psycopg2, psycopg2.extras
+from alertDispatcher import get_alert_dispatcher
+from dbPool import get_db_pool
 
 class AlertManager:
     def __init__(self):
@@ -23,40 +25,72 @@ class AlertManager:
 
     def prepare_crsovr_message(self, df):
         # This alert is initiated for 15 or 30 minute time frame only
+        self.prepare_crsovr_messages([df])
+        return
+
+    def prepare_crsovr_messages(self, frames):
+        """Batch form of prepare_crsovr_message for several symbols' frames:
+        the latest 15m/30m crossover row of each frame is deduplicated
+        against rsicrossover in one query and all new rows are written with
+        one multi-row INSERT, on a single pooled connection."""
+        candidates = []
+        for df in frames:
+            for interval in ("15m", "30m"):
+                for date, row in df[df['interval'] == interval].tail(1).iterrows():
+                    if row['crossover'] == "Bullish" and float(row['buyval']) > 0:
+                        side = "Buy"
+                    elif row['crossover'] == "Bearish" and float(row['buyval']) > 0:
+                        side = "Sell"
+                    else:
+                        continue
+                    message = (f"{row['symbol']} {side} signal on {row['interval']} consider trade at {row['buyval']}:{row['sellval']}:{row['stoploss']}")
+                    candidates.append((self._crsovr_key(row), row, message))
+        if not candidates:
+            return
 
-        arr_interval = [ "15m", "30m"]
-        for i in range(len(arr_interval)):
-            df_sel_rows = df[df['interval'] == arr_interval[i]]
-            for date, row in df_sel_rows.tail(1).iterrows():
-                if (( row['crossover'] == "Bullish") | ( row['crossover'] == "Bearish")):
-                    if (self.isExistsinDB(row) == False):
-                        message = ""
-                        if (row['crossover'] == "Bullish" and  float( row['buyval']) > 0):
-                            message = (f"{row['symbol']} Buy signal on {row['interval']} consider trade at {row['buyval']}:{row['sellval']}:{row['stoploss']}")
-                        elif (row['crossover'] == "Bearish" and float( row['buyval']) > 0):
-                            message = (f"{row['symbol']} Sell signal on {row['interval']} consider trade at {row['buyval']}:{row['sellval']}:{row['stoploss']}")
-                        if (len(message) > 0):
-                            self._message.append( message )
-                            self.AddRecordtoDB(row)
+        try:
+            with get_db_pool().connection() as conn:
+                with conn.cursor() as cur:
+                    existing = set(map(tuple, psycopg2.extras.execute_values(
+                        cur,
+                        "Select \"triggerTime\", \"interval\", \"stocksymbol\" from rsicrossover where \"NotificationSent\"=True and (\"triggerTime\", \"interval\", \"stocksymbol\") in (VALUES %s);",
+                        list({key for key, row, message in candidates}),
+                        fetch=True,
+                    )))
+
+                    new_rows = []
+                    for key, row, message in candidates:
+                        if key in existing:
+                            continue
+                        existing.add(key)
+                        self._message.append(message)
+                        new_rows.append(key + (row['crossover'], row['open'], row['close'], row['low'], row['high'], "TRUE", row['macd'], row['msignal'], row['buyval'], row['sellval'], row['stoploss']))
+
+                    if new_rows:
+                        psycopg2.extras.execute_values(
+                            cur,
+                            "INSERT INTO rsicrossover (\"triggerTime\", \"interval\", \"stocksymbol\", \"crossover\", \"Open\", \"Close\", \"Low\", \"High\", \"NotificationSent\", \"rsiVal\", \"signal\", \"midbnd\", \"ubnd\", \"lbnd\") VALUES %s;",
+                            new_rows,
+                        )
 
+        except psycopg2.Error as e:
+            print(f"Error connecting to or querying the database: {e}")
         return
 
+    @staticmethod
+    def _crsovr_key(row):
+        """(triggerTime, interval, stocksymbol) as stored in rsicrossover."""
+        return (f"{row['nmonth']}-{row['nday']} {row['hour']}:{row['minute']}", str(row['interval']), str(row['symbol']))
+
     def send_chart_alert(self, s_message):
-        url = f"https://api.telegram.org/bot{self.token}/sendMessage?chat_id={self.chat_id}&text={s_message}"
-        return requests.get(url).json()
+        """Queue a Telegram text alert; returns immediately (True if queued)."""
+        return get_alert_dispatcher().send_message(self.token, self.chat_id, s_message)
     
     def send_photo_alert(self, image_buffer: io.BytesIO,filename:     str = "sp.png", set_title = ""):
-        image_buffer.seek(0)
-        data  = {"chat_id": self.chat_id, "caption": set_title, "parse_mode": "HTML"}
-        files = {"photo": (filename, image_buffer, "image/png")}        
-        
-        url = f"https://api.telegram.org/bot{self.token}/sendPhoto"
-        resp = requests.post(url, data=data, files=files, timeout=20)
-        resp.raise_for_status()
-        result = resp.json()
-        if result.get("ok"):
-            print(f"[Telegram] ✓ Photo sent successfully " )        
-        return 
+        """Queue a Telegram photo alert.  The PNG bytes are copied, so the
+        caller may close image_buffer straight away."""
+        return get_alert_dispatcher().send_photo(self.token, self.chat_id, image_buffer.getvalue(),
+                                                 filename=filename, caption=set_title)
 
     def get_message(self):
         return self._message
@@ -64,31 +98,31 @@ class AlertManager:
     def set_message(self, new_message):
         self._message = new_message
 
+    def db_session(self):
+        """Context manager: every DB call made inside it on this thread
+        shares one pooled connection (see dbPool.DbPool.session)."""
+        return get_db_pool().session()
+
     def isExistsinDB(self, row):
         retval=False
-        conn_string = os.getenv("DATABASE_URL")
-        conn = None
         try:
             dtlookupval = f"{row['nmonth']}-{row['nday']} {row['hour']}:{row['minute']}"
-            with psycopg2.connect(conn_string) as conn:
+            with get_db_pool().connection() as conn:
                 # Open a cursor to perform database operations
                 with conn.cursor() as cur:
                     cur.execute("Select \"triggerTime\", \"interval\", \"crossover\" from rsicrossover where \"triggerTime\"=%s and \"interval\"=%s and \"stocksymbol\"=%s and \"NotificationSent\"=True; ", (dtlookupval, row['interval'], row['symbol'],))
                     if (cur.rowcount > 0 ):
                         retval = True
                 cur.close()
-            conn.close()
             return retval
             
         except psycopg2.Error as e:
             print(f"Error connecting to or querying the database: {e}")
 
     def AddRecordtoDB(self, row):
-        conn_string = os.getenv("DATABASE_URL")
-        conn = None
         try:
             dttimeval = f"{row['nmonth']}-{row['nday']} {row['hour']}:{row['minute']}"
-            with psycopg2.connect(conn_string) as conn:
+            with get_db_pool().connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         "INSERT INTO rsicrossover (\"triggerTime\", \"interval\", \"crossover\", \"stocksymbol\", \"Open\", \"Close\", \"Low\", \"High\", \"NotificationSent\", \"rsiVal\", \"signal\", \"midbnd\", \"ubnd\", \"lbnd\") VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);",
@@ -100,8 +134,6 @@ class AlertManager:
         return
 
     def DelOldRecordsFromDB(self):
-        conn_string = os.getenv("DATABASE_URL")
-        conn = None
         try:
             nowdt = datetime.now().date()- timedelta(days=1)
             dttimeval = f"%{nowdt.strftime('%m')}-{nowdt.strftime('%d')}%"
@@ -111,7 +143,7 @@ class AlertManager:
             delete_sql1 = f"DELETE FROM stockorder WHERE CAST(triggerTime AS INTEGER) < {lookupts};"
             
             delete_sql2 = "DELETE FROM mtfstockalert WHERE \"recorddate\" like %s;"
-            with psycopg2.connect(conn_string) as conn:
+            with get_db_pool().connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(delete_sql, (dttimeval,))
                 
@@ -124,10 +156,8 @@ class AlertManager:
         return
 
     def AddOpenStockOrderRecordtoDB(self, row, transstate="Open"):
-        conn_string = os.getenv("DATABASE_URL")
-        conn = None
         try:
-            with psycopg2.connect(conn_string) as conn:
+            with get_db_pool().connection() as conn:
                 with conn.cursor() as cur:
                     #cur.execute("Select * from stockorder where \"symbol\"=%s and \"OrderType\"=%s and \"transstate\"='Open' and \"triggerTime\"=%s; ", (row['symbol'], row['cspattern'], row['unixtime'],))
                     cur.execute("Select * from stockorder where symbol=%s and OrderType=%s and transstate='Open'; ", (row['symbol'], row['cspattern'],))
@@ -150,11 +180,9 @@ class AlertManager:
         return
 
     def GetStockOrderRecordfromDB(self, symbol, transstate="Open"):
-        conn_string = os.getenv("DATABASE_URL")
-        conn = None
         recdata = None
         try:
-            with psycopg2.connect(conn_string) as conn:
+            with get_db_pool().connection() as conn:
                 # Open a cursor to perform database operations
                 with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
                     cur.execute("Select triggerTime, symbol, OrderType, stockprice, stoploss, profittarget, hour, minute, transstate, updatedTriggerTime from stockorder where symbol=%s and transstate=%s; ", (symbol, transstate,))
@@ -166,18 +194,15 @@ class AlertManager:
                                 'hour': row['hour'], 'minute': row['minute'], 'transstate': row['transstate'], 'updatedTriggerTime': row['updatedtriggertime'] }
 
                 cur.close()
-            conn.close()
             return recdata
             
         except psycopg2.Error as e:
             print(f"Error connecting to or querying the database: {e}")
 
     def GetStockOrderRecordusingUnixTime(self, symbol, unixtime, inphour, inpminute):
-        conn_string = os.getenv("DATABASE_URL")
-        conn = None
         recdata = None
         try:
-            with psycopg2.connect(conn_string) as conn:
+            with get_db_pool().connection() as conn:
                 # Open a cursor to perform database operations
                 with conn.cursor(cursor_factory=psycopg2.extras.DictCursor) as cur:
                     cur.execute("Select triggerTime, symbol, OrderType, stockprice, stoploss, profittarget, hour, minute, transstate, updatedTriggerTime from stockorder where symbol=%s and hour=%s and minute=%s ; ", (symbol, inphour, inpminute,))
@@ -189,7 +214,6 @@ class AlertManager:
                                 'hour': row['hour'], 'minute': row['minute'], 'transstate': row['transstate'], 'updatedTriggerTime': row['updatedtriggertime'] }
 
                 cur.close()
-            conn.close()
             print(f"recdata: {recdata}")
             return recdata
             
@@ -197,10 +221,8 @@ class AlertManager:
             print(f"Error connecting to or querying the database: {e}")
 
     def AddCloseStockOrderRecordtoDB(self, row):
-        conn_string = os.getenv("DATABASE_URL")
-        conn = None
         try:
-            with psycopg2.connect(conn_string) as conn:
+            with get_db_pool().connection() as conn:
                 with conn.cursor() as cur:
                     cur.execute(
                         "INSERT INTO stockorder (triggerTime, symbol, OrderType, stockprice, stoploss, profittarget, hour, minute,transstate) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s);",
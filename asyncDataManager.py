@@ -0,0 +1,151 @@
+"""
+asyncDataManager.py
+===================
+asyncio counterpart of dataManager.ServiceManager.
+
+AsyncServiceManager subclasses ServiceManager and only replaces the network
+path: the Yahoo chart request goes through an aiohttp connection pool, so
+many symbols can be downloaded concurrently in one event loop instead of
+one blocking request per worker.  Parsing, resampling, indicators, the
+BarCache and the incremental BarStore are the exact same code (and the
+same shared instances) the sync path uses, so both produce identical frames
+and can run side by side.
+
+Usage:
+    async with AsyncServiceManager() as mgr:
+        df = await mgr.analyze_stockdata("SPY")
+
+    # from sync code (Flask route, batch runner)
+    frames = AsyncServiceManager.run_analyze_symbols(["SPY", "QQQ", "IWM"])
+"""
+
+import asyncio
+
+import aiohttp
+
+from dataManager import (ServiceManager, _ANALYZE_INTERVALS, _INTERVAL_MINUTES,
+                         _bar_cache, _bar_store)
+from httpClient import AsyncHttpClient
+
+
+class AsyncServiceManager(ServiceManager):
+    def __init__(self, client=None):
+        super().__init__()
+        self._client = client or AsyncHttpClient()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        await self._client.close()
+
+    # ------------------------------------------------------------------
+    # Public API (awaitable versions of the ServiceManager methods)
+    # ------------------------------------------------------------------
+
+    async def analyze_stockdata(self, symbol):
+        frames = await self.GetStockdata_MultiInterval(symbol, _ANALYZE_INTERVALS, indicatorList="macd")
+        if frames is None:
+            return None
+        return self._merge_analysis(frames)
+
+    async def analyze_symbols(self, symbols):
+        """analyze_stockdata for every symbol concurrently; returns
+        {symbol: DataFrame or None} in the order given.  A symbol that raises
+        is logged and yields None, like a failed download — it never takes
+        the other symbols down with it."""
+        results = await asyncio.gather(*(self.analyze_stockdata(s) for s in symbols),
+                                       return_exceptions=True)
+        for symbol, result in zip(symbols, results):
+            if isinstance(result, BaseException):
+                print(f"  {symbol}: {result}")
+        return {symbol: None if isinstance(result, BaseException) else result
+                for symbol, result in zip(symbols, results)}
+
+    async def GetStockdata_Byinterval(self, symbol, interval="1d", indicatorList="macd"):
+        endPeriod = self._aligned_endperiod()
+
+        df = await self._download_cached(symbol, endPeriod, interval)
+        if df is None:
+            print("Failed to fetch data. Please check your internet connection.")
+            return None
+
+        df = self._trim_to_interval(df, interval, endPeriod)
+        return self._finalize_interval(df, symbol, interval, indicatorList)
+
+    async def GetStockdata_MultiInterval(self, symbol, intervals=_ANALYZE_INTERVALS,
+                                         indicatorList="macd"):
+        base_interval = self._finest_base(intervals)
+        endPeriod = self._aligned_endperiod()
+
+        base = await self._download_cached(symbol, endPeriod, base_interval)
+        if base is None:
+            print("Failed to fetch data. Please check your internet connection.")
+            return None
+
+        return self._build_intervals(base, base_interval, symbol, intervals, endPeriod, indicatorList)
+
+    async def download_stock_data_incremental(self, symbol, startPeriod, endPeriod, interval="5m"):
+        if interval not in _INTERVAL_MINUTES:
+            return await self.download_stock_data(symbol, startPeriod, endPeriod, interval)
+
+        startPeriod, endPeriod = int(startPeriod), int(endPeriod)
+        key, entry, period1 = self._delta_plan(symbol, startPeriod, interval)
+
+        df = None
+        if entry is not None:
+            delta = await self.download_stock_data(symbol, period1, endPeriod, interval)
+            df    = self._merge_delta(key, entry, startPeriod, endPeriod, period1, delta)
+
+        if df is None:
+            df = await self.download_stock_data(symbol, startPeriod, endPeriod, interval)
+            if df is None:
+                return None
+            _bar_store.put(key, startPeriod, endPeriod - startPeriod, df)
+
+        return df[df['unixtime'] >= startPeriod].copy()
+
+    async def download_stock_data(self, symbol, startPeriod, endPeriod, interval="1d"):
+        """Fetch OHLCV from Yahoo Finance. Returns DataFrame with tz-aware index."""
+        url, params = self._chart_request(symbol, startPeriod, endPeriod, interval)
+
+        try:
+            data = await self._client.get_json(url, params=params)
+            return self._parse_chart(data)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error fetching data: {e}")
+        except (KeyError, ValueError, TypeError) as e:
+            # missing keys, a non-JSON / truncated body, or chart.result null
+            print(f"Error parsing data: {e}")
+        return None
+
+    # ------------------------------------------------------------------
+    # Sync entry-points
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def run_analyze_symbols(cls, symbols):
+        """Run analyze_symbols on a fresh event loop from synchronous code."""
+        async def _run():
+            async with cls() as mgr:
+                return await mgr.analyze_symbols(symbols)
+        return asyncio.run(_run())
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    async def _download_cached(self, symbol, endPeriod, interval):
+        key, stPeriod = self._cache_plan(symbol, endPeriod, interval)
+        df = _bar_cache.get(key)
+        if df is not None:
+            return df
+
+        df = await self.download_stock_data_incremental(symbol, stPeriod, endPeriod.timestamp(), key[1])
+        if df is not None:
+            _bar_cache.put(key, df)
+        return df
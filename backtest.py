@@ -0,0 +1,355 @@
+"""
+backtest.py
+===========
+Historical replay of the csPattern open/close order rules.
+
+Live, `_process_cspattern_symbol` runs csPattern once per poll on a 4-day
+download and round-trips the open order through the `stockorder` table.
+PatternBacktest replays the same rules over any length of 5m history in
+memory, one decision per closed 5m bar:
+
+  • 15m / 30m / 1h bars are resampled once from the 5m series and MACD,
+    candle patterns and MACD structure (macdpattern) are computed over
+    every bar in one vectorised pass each.
+  • Timeframes are aligned with searchsorted: at the close of 5m bar i the
+    rules see that bar, the last 15m / 30m bar that had closed and the 1h
+    bar in progress (its MACD is one EMA step from the last closed hour).
+  • Only the order state machine itself is a loop — open when 5m, 15m, 30m
+    and 1h structure agree (UTC hour <= 20), otherwise update the levels
+    from the last 15m bar until its structure flips — and it only reads
+    precomputed scalars.
+  • While a trade is open each 5m bar's high/low is checked against the
+    stop-loss / profit-target in force; hits are reported and, with
+    exit_on_levels=True, close the trade at the level.
+
+Prices follow the live rules: entry is the 5m EMA-5, exit the open of the
+15m bar whose structure flipped.  Differences from live: decisions use
+closed 5m bars only (live also sees the bar that has just opened), EMAs run
+over the whole history rather than a 4-day window, and the stockorder
+de-duplication by hour:minute is not modelled.
+
+Yahoo serves about 60 days of 5m bars; for longer runs pass a 5m frame
+(unixtime or a datetime index, plus open/high/low/close) to run().
+
+Usage:
+    from backtest import PatternBacktest
+    result = PatternBacktest().run_symbol("SPY", days=59)
+    result = PatternBacktest(exit_on_levels=True).run(df5m, "SPY")
+    print(result.trades)
+    print(result.summary())
+
+Run:
+    python backtest.py SPY 59
+"""
+
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from csPattern import csPattern
+from timeParts import minute_mask, time_parts
+
+_NEUTRAL, _BULLISH, _BEARISH = 0, 1, 2          # csPattern macdpattern codes
+_SIDES = {_BULLISH: "Bullish", _BEARISH: "Bearish"}
+_BAR_SECS = {"5m": 300, "15m": 900, "30m": 1800, "1h": 3600}
+
+_TRADE_COLS = ['symbol', 'cspattern', 'open_time', 'open_price', 'close_time', 'close_price',
+               'close_reason', 'stoploss', 'profittarget', 'stoploss_hit', 'stoploss_time',
+               'profittarget_hit', 'profittarget_time', 'bars', 'pnl', 'pnl_pct']
+_EVENT_COLS = ['unixtime', 'hour', 'minute', 'event', 'symbol', 'cspattern', 'price',
+               'stoploss', 'profittarget', 'cstwopattern', 'csfvgpattern', 'pnl']
+
+
+def _ewm_alpha(span):
+    """Smoothing factor pandas derives from span."""
+    return 1. / (1. + (span - 1) / 2)
+
+
+def _ewm_next(prev, cur, alpha):
+    """One adjust=False ewm step from `prev` (NaN: no history) — the same
+    operations pandas performs, vectorised over many (prev, cur) pairs."""
+    factor = 1. - alpha
+    step = np.where(prev != cur, (factor * prev + alpha * cur) / (factor + alpha), prev)
+    return np.where(np.isnan(prev), cur, step)
+
+
+def _round2(values):
+    """Series.round(2).astype('float32') for an array."""
+    return np.round(values, 2).astype('float32')
+
+
+class BacktestResult:
+    """Trades (one row per round trip) and events (opens, closes, level hits)."""
+    __slots__ = ('trades', 'events')
+
+    def __init__(self, trades, events):
+        self.trades = trades
+        self.events = events
+
+    def summary(self):
+        closed = self.trades[self.trades['close_time'].notna()]
+        wins   = int((closed['pnl'] > 0).sum())
+        return {
+            "trades":            len(closed),
+            "open":              len(self.trades) - len(closed),
+            "wins":              wins,
+            "win_rate":          round(wins / len(closed) * 100, 2) if len(closed) else 0.0,
+            "total_pnl":         round(float(closed['pnl'].sum()), 2),
+            "avg_pnl":           round(float(closed['pnl'].mean()), 2) if len(closed) else 0.0,
+            "stoploss_hits":     int(self.trades['stoploss_hit'].sum()),
+            "profittarget_hits": int(self.trades['profittarget_hit'].sum()),
+        }
+
+
+class PatternBacktest:
+    def __init__(self, exit_on_levels=False):
+        self.exit_on_levels = exit_on_levels
+        self.cs             = csPattern()
+        self.objMgr         = self.cs.objMgr
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def run_symbol(self, symbol, days=59, endPeriod=None):
+        """Download `days` of 5m bars ending at endPeriod (default now) and
+        replay them.  Returns None when the download fails."""
+        endPeriod = endPeriod or datetime.now()
+        startPeriod = endPeriod - timedelta(days=days)
+        df = self.objMgr.download_stock_data(symbol, startPeriod.timestamp(),
+                                             endPeriod.timestamp(), "5m")
+        if df is None:
+            print("Failed to fetch data. Please check your internet connection.")
+            return None
+        return self.run(df, symbol.replace("%3DF", ""))
+
+    def run(self, df5m, symbol="SPY"):
+        """Replay the open/close rules over a 5m frame; returns BacktestResult."""
+        frames = self._build_frames(df5m)
+        if frames is None:
+            return BacktestResult(pd.DataFrame(columns=_TRADE_COLS), pd.DataFrame(columns=_EVENT_COLS))
+        return self._replay(self._align(frames), symbol)
+
+    # ------------------------------------------------------------------
+    # Vectorised preparation
+    # ------------------------------------------------------------------
+
+    def _build_frames(self, df5m):
+        """5m/15m/30m/1h frames with MACD, candle patterns and macdpattern
+        on every bar (5m also gets ema5).  None when there is nothing to replay."""
+        if 'unixtime' in df5m.columns:
+            unixtime = df5m['unixtime'].to_numpy(dtype='int64')
+        else:
+            unixtime = ((df5m.index - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)).to_numpy()
+        base = pd.DataFrame({col: df5m[col].to_numpy(dtype='float32')
+                             for col in ('open', 'high', 'low', 'close')})
+        base.insert(0, 'unixtime', unixtime)
+        base.index = pd.to_datetime(unixtime, unit='s', utc=True).tz_convert('America/New_York')
+        base.index.name = 'timestamp'
+        base = base[minute_mask(unixtime, 5) & base[['open', 'high', 'low', 'close']].notna().all(axis=1)]
+        if len(base) < 3:
+            return None
+        base = self.objMgr._attach_dt_cols(base.copy())
+
+        frames = {"5m": base}
+        for interval in ("15m", "30m", "1h"):
+            frames[interval] = self.objMgr._resample_from_base(base, "5m", interval)
+        for df in frames.values():
+            self.objMgr._calculate_macd_inplace(df)
+            self.cs._identify_candlebreakout_pattern(df)
+            self.cs._identify_macd_structure(df)
+        base['ema5'] = base['close'].ewm(span=5, adjust=False).mean().round(2).astype('float32')
+        return frames
+
+    def _hour_in_progress(self, f1h, t5, close5):
+        """macdpattern codes of the 1h bar in progress at each 5m close:
+        one EMA step from the last closed hour with the 5m close."""
+        close = f1h['close'].astype('float64')
+        ema_fast = close.ewm(span=12, adjust=False).mean()
+        ema_slow = close.ewm(span=26, adjust=False).mean()
+        sig_line = (ema_fast - ema_slow).ewm(span=9, adjust=False).mean().to_numpy()
+        ema_fast, ema_slow = ema_fast.to_numpy(), ema_slow.to_numpy()
+
+        t1h  = f1h['unixtime'].to_numpy(dtype='int64')
+        hour = np.searchsorted(t1h, t5, side='right') - 1
+        prev = hour - 1
+        has_prev = prev >= 0
+
+        def before(values):
+            out = np.full(len(prev), np.nan, dtype=values.dtype)
+            out[has_prev] = values[prev[has_prev]]
+            return out
+
+        close5    = close5.astype('float64')
+        fast      = _ewm_next(before(ema_fast), close5, _ewm_alpha(12))
+        slow      = _ewm_next(before(ema_slow), close5, _ewm_alpha(26))
+        macd_line = fast - slow
+        signal    = _ewm_next(before(sig_line), macd_line, _ewm_alpha(9))
+
+        codes = self.cs._structure_codes(
+            _round2(macd_line), _round2(signal), _round2(macd_line - signal),
+            prev=tuple(before(f1h[col].to_numpy()) for col in ('macd', 'msignal', 'histogram')))
+        codes[hour < 2] = _NEUTRAL
+        return codes
+
+    def _align(self, frames):
+        """Per-5m-close arrays of everything the open/close rules read."""
+        f5, f15, f30 = frames["5m"], frames["15m"], frames["30m"]
+        t5    = f5['unixtime'].to_numpy(dtype='int64')
+        polls = t5 + _BAR_SECS["5m"]
+
+        def last_closed(df, interval):
+            starts = df['unixtime'].to_numpy(dtype='int64')
+            return np.searchsorted(starts + _BAR_SECS[interval], polls, side='right') - 1
+
+        j15, j30 = last_closed(f15, "15m"), last_closed(f30, "30m")
+        p5  = f5['macdpattern'].cat.codes.to_numpy()
+        p15 = f15['macdpattern'].cat.codes.to_numpy()
+        p30 = f30['macdpattern'].cat.codes.to_numpy()
+        p1h = self._hour_in_progress(frames["1h"], t5, f5['close'].to_numpy())
+
+        # Open: all four structures agree on a direction
+        valid = (j15 >= 0) & (j30 >= 0)
+        j15c, j30c = np.maximum(j15, 0), np.maximum(j30, 0)
+        agree = valid & (p5 == p1h) & (p5 == p30[j30c]) & (p5 == p15[j15c])
+        side  = np.where(agree & (polls // 3600 % 24 <= 20), p5, _NEUTRAL)
+
+        parts5, parts15 = time_parts(t5), time_parts(f15['unixtime'])
+        return {
+            "n":        len(t5),
+            "open":     side.tolist(),
+            "t5":       t5.tolist(),
+            "hour5":    parts5.hour.tolist(),
+            "minute5":  parts5.minute.tolist(),
+            "ema5":     f5['ema5'].tolist(),
+            "high5":    f5['high'].tolist(),
+            "low5":     f5['low'].tolist(),
+            "two5":     f5['cstwopattern'].astype(str).tolist(),
+            "fvg5":     f5['csfvgpattern'].astype(str).tolist(),
+            "low30":    f30['low'].to_numpy()[j30c].tolist(),
+            "high30":   f30['high'].to_numpy()[j30c].tolist(),
+            "close30":  f30['close'].to_numpy()[j30c].tolist(),
+            "j15":      j15.tolist(),
+            "p15":      p15.tolist(),
+            "t15":      f15['unixtime'].tolist(),
+            "hour15":   parts15.hour.tolist(),
+            "minute15": parts15.minute.tolist(),
+            "open15":   f15['open'].tolist(),
+            "high15":   f15['high'].tolist(),
+            "low15":    f15['low'].tolist(),
+            "two15":    f15['cstwopattern'].astype(str).tolist(),
+            "fvg15":    f15['csfvgpattern'].astype(str).tolist(),
+        }
+
+    # ------------------------------------------------------------------
+    # Order state machine
+    # ------------------------------------------------------------------
+
+    def _replay(self, a, symbol):
+        trades, events = [], []
+        order = None
+
+        def event(kind, unixtime, hour, minute, price, pnl=np.nan):
+            events.append({
+                "unixtime": unixtime, "hour": hour, "minute": minute, "event": kind,
+                "symbol": symbol, "cspattern": order['cspattern'], "price": price,
+                "stoploss": order['stoploss'], "profittarget": order['profittarget'],
+                "cstwopattern": order['cstwopattern'], "csfvgpattern": order['csfvgpattern'],
+                "pnl": pnl,
+            })
+
+        def close(unixtime, hour, minute, price, reason):
+            sign = 1. if order['cspattern'] == "Bullish" else -1.
+            pnl  = round(sign * (price - order['stockprice']), 2)
+            event("Close", unixtime, hour, minute, price, pnl)
+            order.update(close_time=unixtime, close_price=price, close_reason=reason, pnl=pnl,
+                         pnl_pct=round(pnl / order['stockprice'] * 100, 4))
+
+        for k in range(a["n"]):
+            # ---- open (no order held at the start of this poll) ----
+            if order is None:
+                side = a["open"][k]
+                if side == _NEUTRAL:
+                    continue
+                if side == _BULLISH:
+                    stoploss, profittarget = a["low30"][k], a["close30"][k]
+                else:
+                    stoploss, profittarget = a["high30"][k], a["low30"][k]
+                order = {
+                    "cspattern":    _SIDES[side],
+                    "stockprice":   round(a["ema5"][k], 2),
+                    "open_time":    a["t5"][k],
+                    "stoploss":     round(stoploss, 2),
+                    "profittarget": round(profittarget, 2),
+                    "cstwopattern": a["two5"][k],
+                    "csfvgpattern": a["fvg5"][k],
+                    "stoploss_time": None, "profittarget_time": None,
+                    "close_time":   None, "close_price": np.nan, "close_reason": None,
+                    "open_bar":     k, "pnl": np.nan, "pnl_pct": np.nan,
+                }
+                event("Open", a["t5"][k], a["hour5"][k], a["minute5"][k], order['stockprice'])
+                continue
+
+            # ---- levels in force against this 5m bar ----
+            bullish = order['cspattern'] == "Bullish"
+            high, low = a["high5"][k], a["low5"][k]
+            sl_hit = low <= order['stoploss'] if bullish else high >= order['stoploss']
+            pt_hit = high >= order['profittarget'] if bullish else low <= order['profittarget']
+            hits = []
+            if sl_hit and order['stoploss_time'] is None:
+                order['stoploss_time'] = a["t5"][k]
+                hits.append(("StopLoss", order['stoploss']))
+            if pt_hit and order['profittarget_time'] is None:
+                order['profittarget_time'] = a["t5"][k]
+                hits.append(("ProfitTarget", order['profittarget']))
+            for kind, level in hits:
+                event(kind, a["t5"][k], a["hour5"][k], a["minute5"][k], level)
+            if self.exit_on_levels and (sl_hit or pt_hit):
+                kind, level = ("StopLoss", order['stoploss']) if sl_hit else ("ProfitTarget", order['profittarget'])
+                close(a["t5"][k], a["hour5"][k], a["minute5"][k], level, kind)
+                order['bars'] = k - order['open_bar']
+                trades.append(order)
+                order = None
+                continue
+
+            # ---- close check against the last closed 15m bar ----
+            j = a["j15"][k]
+            cur = a["p15"][j]
+            if cur == _NEUTRAL or _SIDES.get(cur) == order['cspattern']:
+                order['cstwopattern'] = a["two15"][j]
+                order['csfvgpattern'] = a["fvg15"][j]
+                if bullish:
+                    order['profittarget'] = round(a["high15"][j], 2)
+                    order['stoploss']     = round(a["low15"][j],  2)
+                else:
+                    order['profittarget'] = round(a["low15"][j],  2)
+                    order['stoploss']     = round(a["high15"][j], 2)
+            else:
+                close(a["t15"][j], a["hour15"][j], a["minute15"][j], round(a["open15"][j], 2), "Flip")
+                order['bars'] = k - order['open_bar']
+                trades.append(order)
+                order = None
+
+        if order is not None:
+            order['bars'] = a["n"] - 1 - order['open_bar']
+            trades.append(order)
+
+        for trade in trades:
+            trade['symbol']           = symbol
+            trade['open_price']       = trade['stockprice']
+            trade['stoploss_hit']     = trade['stoploss_time'] is not None
+            trade['profittarget_hit'] = trade['profittarget_time'] is not None
+        return BacktestResult(pd.DataFrame(trades, columns=_TRADE_COLS),
+                              pd.DataFrame(events, columns=_EVENT_COLS))
+
+
+if __name__ == '__main__':
+    symbol = sys.argv[1] if len(sys.argv) > 1 else "SPY"
+    days   = int(sys.argv[2]) if len(sys.argv) > 2 else 59
+    result = PatternBacktest().run_symbol(symbol, days)
+    if result is not None:
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(result.trades)
+        print(result.summary())
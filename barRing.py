@@ -0,0 +1,208 @@
+"""
+barRing.py
+==========
+Fixed-capacity ring buffer of recent bars for the signal path.
+
+The signal code only ever looks at the last handful of bars of each
+interval (last / previous row, a 3-row MACD structure, today's last N rows)
+but used to do it through 5–25 row DataFrames: every `iloc[-1]` builds a
+row Series, every slice is a `.copy()`, every flag an indexed `.loc` write.
+BarRing keeps one NumPy array per column instead:
+
+  • `ring.last`, `ring.prev`, `ring.row(-3)` are BarRow views — `row['macd']`
+    is a plain array read, no Series is constructed.
+  • `append(row)` overwrites the oldest bar once `capacity` is reached.
+  • `tail(n)` / `select(mask)` / `column(name)` work on the arrays.
+  • `to_frame()` rebuilds a DataFrame with the original dtypes (categories
+    included) — only at the JSON / template boundary.
+
+Usage:
+    from barRing import BarRing
+    ring = BarRing.from_frame(df, capacity=25)
+    if ring.last['close'] > ring.prev['high']: ...
+    ring.set('macdpattern', 'Bullish')           # last bar
+    df = ring.to_frame()
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class BarRow:
+    """Read-only view of one bar: `row['close']`, `'ema5' in row`."""
+    __slots__ = ('_ring', '_pos')
+
+    def __init__(self, ring, pos):
+        self._ring = ring
+        self._pos  = pos
+
+    def __getitem__(self, name):
+        return self._ring._data[name][self._pos]
+
+    def __contains__(self, name):
+        return name in self._ring._data
+
+    def get(self, name, default=None):
+        values = self._ring._data.get(name)
+        return default if values is None else values[self._pos]
+
+    def to_dict(self):
+        return {name: values[self._pos] for name, values in self._ring._data.items()}
+
+    def __repr__(self):
+        return f"BarRow({self.to_dict()})"
+
+
+class BarRing:
+    def __init__(self, capacity, dtypes, index_dtype=None, index_name=None):
+        """Empty ring for columns {name: pandas dtype}."""
+        self.capacity     = capacity
+        self._dtypes      = dict(dtypes)
+        self._index_dtype = index_dtype
+        self._index_name  = index_name
+        self._data        = {name: self._alloc(dtype, capacity) for name, dtype in self._dtypes.items()}
+        self._index       = None if index_dtype is None else self._alloc(index_dtype, capacity)
+        self._start       = 0
+        self._size        = 0
+
+    # ------------------------------------------------------------------
+    # Construction / conversion
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_frame(cls, df, capacity=None):
+        """Ring holding the last `capacity` rows of df (all rows if None)."""
+        capacity = capacity or max(len(df), 1)
+        tail = df.iloc[-capacity:]
+        ring = cls(capacity, df.dtypes.to_dict(),
+                   index_dtype=df.index.dtype, index_name=df.index.name)
+        n = len(tail)
+        for name in ring._data:
+            ring._data[name][:n] = cls._values(tail[name])
+        ring._index[:n] = cls._values(tail.index)
+        ring._size = n
+        return ring
+
+    def to_frame(self):
+        """DataFrame of the bars (oldest first) with the original dtypes."""
+        order = self._order()
+        cols  = {name: self._restore(values[order], self._dtypes[name])
+                 for name, values in self._data.items()}
+        if self._index is None:
+            return pd.DataFrame(cols)
+        index = pd.Index(self._restore(self._index[order], self._index_dtype), name=self._index_name)
+        return pd.DataFrame(cols, index=index)
+
+    # ------------------------------------------------------------------
+    # Bars
+    # ------------------------------------------------------------------
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def empty(self):
+        return self._size == 0
+
+    @property
+    def columns(self):
+        return list(self._data)
+
+    def __contains__(self, name):
+        return name in self._data
+
+    def row(self, i):
+        """BarRow for bar i (negative counts from the newest)."""
+        if not -self._size <= i < self._size:
+            raise IndexError(f"bar {i} out of range for {self._size} bars")
+        return BarRow(self, (self._start + i % self._size) % self.capacity)
+
+    @property
+    def last(self):
+        return self.row(-1)
+
+    @property
+    def prev(self):
+        return self.row(-2)
+
+    def append(self, row, index=None):
+        """Add a bar (dict of column values); the oldest is overwritten once
+        the ring is full.  Missing columns keep their previous slot value."""
+        if self._size < self.capacity:
+            pos = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            pos = self._start
+            self._start = (self._start + 1) % self.capacity
+        for name, value in row.items():
+            self._data[name][pos] = value
+        if index is not None and self._index is not None:
+            self._index[pos] = index
+
+    # ------------------------------------------------------------------
+    # Columns
+    # ------------------------------------------------------------------
+
+    def column(self, name):
+        """Values of one column, oldest first (a copy)."""
+        return self._data[name][self._order()]
+
+    def set(self, name, value, i=-1):
+        self._data[name][self.row(i)._pos] = value
+
+    def add_column(self, name, fill, dtype=None):
+        """New column filled with `fill` (a scalar, or values aligned with
+        column()); dtype defaults to what pandas would infer for
+        `df[name] = fill`."""
+        dtype = dtype or pd.Series(fill if np.ndim(fill) else [fill]).dtype
+        self._dtypes[name] = dtype
+        self._data[name]   = self._alloc(dtype, self.capacity)
+        self._data[name][self._order()] = fill
+
+    # ------------------------------------------------------------------
+    # Slicing
+    # ------------------------------------------------------------------
+
+    def tail(self, n):
+        return self._take(self._order()[-n:] if n else self._order()[:0])
+
+    def select(self, mask):
+        """Bars where the boolean mask (aligned with column()) is True."""
+        return self._take(self._order()[np.asarray(mask, dtype=bool)])
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    def _order(self):
+        return (self._start + np.arange(self._size)) % self.capacity
+
+    def _take(self, positions):
+        ring = BarRing(max(len(positions), 1), self._dtypes, self._index_dtype, self._index_name)
+        n = len(positions)
+        for name, values in self._data.items():
+            ring._data[name][:n] = values[positions]
+        if self._index is not None:
+            ring._index[:n] = self._index[positions]
+        ring._size = n
+        return ring
+
+    @staticmethod
+    def _alloc(dtype, capacity):
+        """NumPy storage for a pandas dtype: numeric dtypes as themselves,
+        everything else (categories, strings, dates, tz-aware times) as object."""
+        if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+            return np.zeros(capacity, dtype=dtype)
+        return np.empty(capacity, dtype=object)
+
+    @staticmethod
+    def _values(values):
+        if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biuf':
+            return values.to_numpy()
+        return values.to_numpy(dtype=object)
+
+    @staticmethod
+    def _restore(values, dtype):
+        if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+            return values
+        return pd.array(values, dtype=dtype)
@@ -0,0 +1,541 @@
+"""
+benchmark.py
+============
+Equivalence + timing checks for the vectorised hot paths.  Each benchmark
+runs the previous (row-loop) implementation kept here as a reference
+against the current one on synthetic bars, asserts identical output and
+prints both timings.  `alert_dispatcher` instead checks the Telegram
+retry / coalescing / drop-oldest behaviour against a local fake Bot API.
+
+Run:
+    python benchmark.py               # all benchmarks
+    python benchmark.py candlebreakout sessions
+"""
+
+import sys
+import time
+
+import numpy  as np
+import pandas as pd
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def synthetic_bars(n=10_000, seed=7, freq='5min', start='2024-01-02 04:00'):
+    """Random-walk OHLCV bars on a tz-aware ET index, rounded to cents."""
+    rng   = np.random.default_rng(seed)
+    close = 500 + np.cumsum(rng.normal(0, 0.35, n))
+    open_ = close + rng.normal(0, 0.25, n)
+    high  = np.maximum(open_, close) + np.abs(rng.normal(0, 0.2, n))
+    low   = np.minimum(open_, close) - np.abs(rng.normal(0, 0.2, n))
+    idx   = pd.date_range(start, periods=n, freq=freq, tz='America/New_York')
+    return pd.DataFrame({
+        'open':   np.round(open_, 2).astype('float32'),
+        'high':   np.round(high,  2).astype('float32'),
+        'low':    np.round(low,   2).astype('float32'),
+        'close':  np.round(close, 2).astype('float32'),
+        'volume': rng.integers(1_000, 50_000, n),
+    }, index=idx)
+
+
+def timed(func, *args, repeat=3, **kwargs):
+    """Best-of-`repeat` wall time in seconds, plus the last result."""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def report(name, legacy_s, current_s):
+    print(f"{name:<28} legacy {legacy_s * 1000:9.2f} ms   "
+          f"current {current_s * 1000:9.2f} ms   x{legacy_s / current_s:7.1f}")
+
+
+# ---------------------------------------------------------------------------
+# csPattern._identify_candlebreakout_pattern
+# ---------------------------------------------------------------------------
+
+def _legacy_candlebreakout(df):
+    """Per-bar loop csPattern used before vectorisation."""
+    n = len(df)
+    opens  = df['open'].to_numpy(dtype='float32')
+    highs  = df['high'].to_numpy(dtype='float32')
+    lows   = df['low'].to_numpy(dtype='float32')
+    closes = df['close'].to_numpy(dtype='float32')
+
+    cspattern_arr    = np.full(n, 'Neutral', dtype=object)
+    cstwopattern_arr = np.full(n, 'na',      dtype=object)
+    csfvgpattern_arr = np.full(n, 'na',      dtype=object)
+    for i in range(1, n):
+        o, h, l, c     = opens[i],   highs[i],   lows[i],   closes[i]
+        o1, h1, l1, c1 = opens[i-1], highs[i-1], lows[i-1], closes[i-1]
+        sig = cspattern_arr[i-1]
+        if c > h1:
+            sig = 'Bullish'
+        elif c < l1:
+            sig = 'Bearish'
+        cspattern_arr[i] = sig
+        if c > o and c1 < o1 and c > o1 and o < c1:
+            cstwopattern_arr[i] = 'UlEngulf'
+        elif c < o and c1 > o1 and c < o1 and o > c1:
+            cstwopattern_arr[i] = 'EaEngulf'
+        if i >= 2:
+            if lows[i-2] > h:
+                csfvgpattern_arr[i] = 'EaFVG'
+            elif highs[i-2] < l:
+                csfvgpattern_arr[i] = 'UlFVG'
+
+    df['cspattern']    = pd.Categorical(cspattern_arr,    categories=['Neutral', 'Bullish', 'Bearish'])
+    df['cstwopattern'] = pd.Categorical(cstwopattern_arr, categories=['na', 'UlEngulf', 'EaEngulf'])
+    df['csfvgpattern'] = pd.Categorical(csfvgpattern_arr, categories=['na', 'EaFVG', 'UlFVG'])
+    return df
+
+
+def bench_candlebreakout(n=10_000):
+    from csPattern import csPattern
+    cs   = csPattern()
+    bars = synthetic_bars(n)
+
+    legacy_s,  legacy  = timed(_legacy_candlebreakout, bars.copy())
+    current_s, current = timed(cs._identify_candlebreakout_pattern, bars.copy())
+    pd.testing.assert_frame_equal(legacy, current)
+    for tiny in (1, 2, 3):
+        pd.testing.assert_frame_equal(_legacy_candlebreakout(bars.head(tiny).copy()),
+                                      cs._identify_candlebreakout_pattern(bars.head(tiny).copy()))
+    report(f"candlebreakout ({n} bars)", legacy_s, current_s)
+
+
+# ---------------------------------------------------------------------------
+# SupportResistanceByInputInterval.classify_trading_sessions
+# ---------------------------------------------------------------------------
+
+def _legacy_classify_trading_sessions(data):
+    """Per-timestamp loop supresrange used before vectorisation."""
+    data_with_sessions = data.copy()
+    data_with_sessions.index = data_with_sessions.index.tz_convert('America/New_York')
+
+    sessions = []
+    for timestamp in data_with_sessions.index:
+        time_in_minutes = timestamp.hour * 60 + timestamp.minute
+        if 4 * 60 <= time_in_minutes < 9 * 60 + 30:
+            sessions.append('Pre-Market')
+        elif 9 * 60 + 30 <= time_in_minutes < 16 * 60:
+            sessions.append('Regular')
+        elif 16 * 60 <= time_in_minutes < 20 * 60:
+            sessions.append('After-Hours')
+        else:
+            sessions.append('Closed')
+    data_with_sessions['Session'] = sessions
+    return data_with_sessions
+
+
+def bench_sessions(n=130_000):
+    from supresrange import SupportResistanceByInputInterval
+    sr = SupportResistanceByInputInterval('SPY', '1m')
+    # ~3 months of round-the-clock 1m bars, stored in UTC like yfinance
+    sr.data = synthetic_bars(n, freq='1min', start='2024-01-02 00:00').tz_convert('UTC')
+
+    legacy_s,  legacy  = timed(_legacy_classify_trading_sessions, sr.data)
+    current_s, current = timed(sr.classify_trading_sessions)
+    assert current['Session'].dtype == 'category'
+    # values outside the categories would turn into NaN and fail the check
+    pd.testing.assert_frame_equal(legacy.astype({'Session': current['Session'].dtype}), current)
+    report(f"sessions ({n} bars)", legacy_s, current_s)
+
+
+# ---------------------------------------------------------------------------
+# SupportResistanceByInputInterval.scalping_moving_averages
+# ---------------------------------------------------------------------------
+
+def _legacy_hull_ma(prices, period):
+    """rolling().apply(np.average) Hull MA supresrange used before."""
+    wma1 = prices.rolling(period//2).apply(lambda x: np.average(x, weights=range(1, len(x)+1)))
+    wma2 = prices.rolling(period).apply(lambda x: np.average(x, weights=range(1, len(x)+1)))
+    diff = 2 * wma1 - wma2
+    return diff.rolling(int(np.sqrt(period))).apply(lambda x: np.average(x, weights=range(1, len(x)+1)))
+
+
+def _legacy_scalping_moving_averages(data):
+    mas, emas = {}, {}
+    for period in [8, 13, 21, 34, 55]:
+        if len(data) >= period:
+            mas[f'MA_{period}']  = data['Close'].rolling(period).mean().iloc[-1]
+            emas[f'EMA_{period}'] = data['Close'].ewm(span=period).mean().iloc[-1]
+    return {
+        'simple_mas': mas,
+        'exponential_mas': emas,
+        'hull_mas': {'HMA_9':  _legacy_hull_ma(data['Close'], 9).iloc[-1],
+                     'HMA_21': _legacy_hull_ma(data['Close'], 21).iloc[-1]},
+    }
+
+
+def _assert_close_dicts(a, b, rtol=1e-9):
+    assert a.keys() == b.keys(), (a.keys(), b.keys())
+    for key in a:
+        if isinstance(a[key], dict):
+            _assert_close_dicts(a[key], b[key], rtol)
+        else:
+            np.testing.assert_allclose(b[key], a[key], rtol=rtol, err_msg=key)
+
+
+def bench_moving_averages(n=20_000):
+    from supresrange import SupportResistanceByInputInterval, hull_ma
+    bars = synthetic_bars(n).rename(columns=str.capitalize)
+    bars.iloc[n // 2, bars.columns.get_loc('Close')] = np.nan
+
+    # full-series Hull MA, NaN propagation included
+    for period in (9, 21):
+        np.testing.assert_allclose(hull_ma(bars['Close'], period),
+                                   _legacy_hull_ma(bars['Close'].astype('float64'), period).to_numpy(),
+                                   rtol=1e-9)
+
+    def current(data):
+        sr = SupportResistanceByInputInterval('SPY', '5m')
+        sr.data = data
+        return sr.scalping_moving_averages()
+
+    legacy_s,  legacy  = timed(_legacy_scalping_moving_averages, bars.astype({'Close': 'float64'}), repeat=1)
+    current_s, result  = timed(current, bars)
+    _assert_close_dicts(legacy, result)
+    report(f"moving averages ({n} bars)", legacy_s, current_s)
+
+
+# ---------------------------------------------------------------------------
+# SupportResistanceByInputInterval.volume_profile_15min
+# ---------------------------------------------------------------------------
+
+def _legacy_volume_profile(recent_data, num_bins=20):
+    """Per-bin boolean-mask loop supresrange used before (num_bins edges)."""
+    price_bins = np.linspace(recent_data['Low'].min(), recent_data['High'].max(), num_bins)
+    volume_profile = []
+    for i in range(len(price_bins) - 1):
+        bin_low, bin_high = price_bins[i], price_bins[i + 1]
+        mask = (recent_data['Low'] <= bin_high) & (recent_data['High'] >= bin_low)
+        volume_in_bin = recent_data.loc[mask, 'Volume'].sum()
+        if volume_in_bin > 0:
+            volume_profile.append({'price': (bin_low + bin_high) / 2, 'volume': volume_in_bin,
+                                   'price_range': (bin_low, bin_high)})
+    volume_profile.sort(key=lambda x: x['volume'], reverse=True)
+    return {'high_volume_nodes': volume_profile[:5],
+            'point_of_control': volume_profile[0] if volume_profile else None}
+
+
+def bench_volume_profile(n=20_000, bins=200):
+    from supresrange import SupportResistanceByInputInterval
+    sr = SupportResistanceByInputInterval('SPY', '5m')
+    # yfinance hands back float64 prices
+    sr.data = synthetic_bars(n).rename(columns=str.capitalize).astype({c: 'float64' for c in ('Open', 'High', 'Low', 'Close')})
+
+    # the original full-credit mode reproduces the old loop exactly
+    for window, nbins in ((96, 19), (n, bins)):
+        legacy  = _legacy_volume_profile(sr.data.tail(window), nbins + 1)
+        current = sr.volume_profile_15min(window, bins=nbins, split_volume=False)
+        assert [(v['price'], v['volume'], v['price_range']) for v in legacy['high_volume_nodes']] == \
+               [(v['price'], v['volume'], v['price_range']) for v in current['high_volume_nodes']]
+
+    # split mode conserves volume and the value area brackets the POC
+    split = sr.volume_profile_15min(n, bins=bins)
+    assert split['value_area_low'] <= split['point_of_control']['price'] <= split['value_area_high']
+
+    legacy_s,  _ = timed(_legacy_volume_profile, sr.data, bins + 1, repeat=1)
+    current_s, _ = timed(sr.volume_profile_15min.__wrapped__, sr, n, bins=bins)
+    report(f"volume profile ({bins} bins)", legacy_s, current_s)
+
+
+# ---------------------------------------------------------------------------
+# Candlestick rendering (supresrange.plot_candlesticks / stockAnalysis._build_chart)
+# ---------------------------------------------------------------------------
+
+def _legacy_candles_patches(ax, times, o, h, l, c, width):
+    """Rectangle + Line2D per bar, as supresrange.plot_candlesticks did."""
+    from matplotlib.patches import Rectangle
+    for i in range(len(times)):
+        ax.plot([times[i], times[i]], [l[i], h[i]], color='black', linewidth=1, alpha=0.8, zorder=2)
+        if c[i] != o[i]:
+            up = c[i] >= o[i]
+            ax.add_patch(Rectangle((times[i] - width / 2, min(o[i], c[i])), width, abs(c[i] - o[i]),
+                                   facecolor='green' if up else 'red',
+                                   edgecolor='darkgreen' if up else 'darkred',
+                                   alpha=0.8, linewidth=1, zorder=3))
+        else:
+            ax.plot([times[i] - width / 2, times[i] + width / 2], [c[i], c[i]], color='black', linewidth=2, zorder=3)
+
+
+def _legacy_candles_bars(ax, xs, o, h, l, c, width):
+    """bar() + plot() per row, as stockAnalysis._build_chart did."""
+    for i in range(len(xs)):
+        color = '#3fb950' if c[i] >= o[i] else '#f85149'
+        ax.bar(xs[i], abs(c[i] - o[i]), bottom=min(o[i], c[i]), width=width, color=color, linewidth=0, zorder=3)
+        ax.plot([xs[i], xs[i]], [l[i], h[i]], color=color, lw=0.9, zorder=2)
+
+
+def _render(draw):
+    import io
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots(figsize=(12, 6))
+    draw(ax)
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png')
+    plt.close(fig)
+    return buf
+
+
+def bench_candles(n=400):
+    from chartRenderer import draw_candlesticks
+    bars  = synthetic_bars(n, freq='15min')
+    o, h, l, c = (bars[k].to_numpy('float64') for k in ('open', 'high', 'low', 'close'))
+    times = bars.index
+    width = pd.Timedelta(minutes=12)
+    xs    = np.arange(n)
+
+    legacy_s, _ = timed(_render, lambda ax: _legacy_candles_patches(ax, times, o, h, l, c, width))
+    current_s, _ = timed(_render, lambda ax: draw_candlesticks(
+        ax, times, o, h, l, c, width=width, up_edge='darkgreen', down_edge='darkred', edge_width=1,
+        body_alpha=0.8, wick_color='black', wick_alpha=0.8, doji_color='black'))
+    report(f"candles datetime ({n} bars)", legacy_s, current_s)
+
+    legacy_s, _ = timed(_render, lambda ax: _legacy_candles_bars(ax, xs, o, h, l, c, 0.6))
+    current_s, _ = timed(_render, lambda ax: draw_candlesticks(
+        ax, xs, o, h, l, c, width=0.6, up_color='#3fb950', down_color='#f85149', wick_width=0.9))
+    report(f"candles index ({n} bars)", legacy_s, current_s)
+
+
+# ---------------------------------------------------------------------------
+# dataManager MACD / RSI: batch ewm vs indicatorEngine
+# ---------------------------------------------------------------------------
+
+def bench_indicators(n=1_150, polls=50):
+    from dataManager import ServiceManager
+    from indicatorEngine import IndicatorEngine
+    bars = synthetic_bars(n)
+    bars['unixtime'] = ((bars.index - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)).astype('int32')
+    cols = ['macd', 'msignal', 'histogram', 'rsi', 'rsignal', 'crossover']
+
+    def batch(df):
+        return ServiceManager._calculate_rsi_inplace(ServiceManager._calculate_macd_inplace(df))
+
+    engine = IndicatorEngine()
+
+    def streaming(df):
+        return engine.rsi(('SYN', '5m'), engine.macd(('SYN', '5m'), df))
+
+    # One poll per live-bar update: the last close moves, earlier bars don't
+    frames = []
+    for i in range(polls):
+        df = bars.iloc[:n - polls + i + 1].copy()
+        df.iloc[-1, df.columns.get_loc('close')] += np.float32(0.01 * (i % 7))
+        frames.append(df)
+
+    legacy_s,  expected = timed(lambda: [batch(df.copy())[cols].tail(5) for df in frames])
+    current_s, actual   = timed(lambda: [streaming(df.copy())[cols].tail(5) for df in frames])
+    for want, got in zip(expected, actual):
+        pd.testing.assert_frame_equal(want.astype({'crossover': object}), got.astype({'crossover': object}))
+    report(f"indicators ({polls} polls)", legacy_s, current_s)
+
+    # Rolling download window: the first bar moves too.  1h/4h windows
+    # (~64/16 bars) are too short for a carried-over state to converge, so
+    # the engine must match batch ewm over exactly the bars in the frame.
+    for interval, window, slide in (('1h', 64, 1), ('4h', 16, 4), ('5m', 1_150, 1)):
+        slid_engine = IndicatorEngine()
+        for i in range(polls):
+            df = bars.iloc[i * slide:i * slide + window].copy()
+            want = batch(df.copy())[cols].tail(5)
+            got  = slid_engine.rsi(('SYN', interval), slid_engine.macd(('SYN', interval), df))[cols].tail(5)
+            pd.testing.assert_frame_equal(want.astype({'crossover': object}), got.astype({'crossover': object}))
+    print(f"{'indicators sliding window':<28} identical to batch ({polls} polls x 1h/4h/5m)")
+
+
+# ---------------------------------------------------------------------------
+# csPattern MACD structure: 3-row scorer per bar vs whole-series scorer
+# ---------------------------------------------------------------------------
+
+def _legacy_structure(last_row, prev_row):
+    """csPattern._structure_usingInputRows before vectorisation (minus its
+    gc.collect(), which alone costs milliseconds per call)."""
+    histogram = last_row['histogram']
+    if abs(histogram) < 0.005:
+        return "Neutral"
+    macd_value, macd_signal = last_row['macd'], last_row['msignal']
+    prev_macd, prev_signal, prev_histogram = prev_row['macd'], prev_row['msignal'], prev_row['histogram']
+    bullish_score = bearish_score = 0
+
+    if macd_value > 0:
+        bullish_score += 1
+    elif macd_value < 0:
+        bearish_score += 1
+    if abs(macd_value - macd_signal) >= 0.005 * 0.5:
+        if macd_value > macd_signal:
+            bullish_score += 2
+        else:
+            bearish_score += 2
+    if histogram > 0:
+        bullish_score += 1
+    else:
+        bearish_score += 1
+
+    if prev_macd <= prev_signal and macd_value > macd_signal:
+        bullish_score += 1 if histogram <= 0 else 3
+    if prev_macd >= prev_signal and macd_value < macd_signal:
+        bearish_score += 1 if histogram >= 0 else 3
+    if prev_macd <= 0 and macd_value > 0:
+        bullish_score += 2
+    elif prev_macd >= 0 and macd_value < 0:
+        bearish_score += 2
+
+    hist_change = histogram - prev_histogram
+    if histogram > 0 and hist_change > 0:
+        bullish_score += 1
+    elif histogram > 0 and hist_change < 0:
+        bearish_score += 1
+    elif histogram < 0 and hist_change < 0:
+        bearish_score += 1
+    elif histogram < 0 and hist_change > 0:
+        bullish_score += 1
+    if prev_histogram < 0 and histogram > 0:
+        bullish_score += 2
+    elif prev_histogram > 0 and histogram < 0:
+        bearish_score += 2
+
+    net_score = bullish_score - bearish_score
+    if net_score > 2:
+        return "Bullish"
+    return "Neutral" if net_score >= -2 else "Bearish"
+
+
+def _legacy_macd_structure(df):
+    """Score every bar through the 3-row function, one row Series at a time."""
+    labels = ["Neutral"] * len(df)
+    for i in range(2, len(df)):
+        labels[i] = _legacy_structure(df.iloc[i], df.iloc[i - 1])
+    return pd.Categorical(labels, categories=['Neutral', 'Bullish', 'Bearish'])
+
+
+def bench_macd_structure(n=5_000):
+    from csPattern import csPattern
+    from dataManager import ServiceManager
+    cs   = csPattern.__new__(csPattern)
+    bars = ServiceManager._calculate_macd_inplace(synthetic_bars(n))[['macd', 'msignal', 'histogram']]
+
+    legacy_s,  legacy  = timed(_legacy_macd_structure, bars, repeat=1)
+    current_s, current = timed(lambda: cs._identify_macd_structure(bars.copy())['macdpattern'].array)
+    pd.testing.assert_extension_array_equal(legacy, current)
+    report(f"macd structure ({n} bars)", legacy_s, current_s)
+
+
+# ---------------------------------------------------------------------------
+# alertDispatcher against a local fake Bot API
+# ---------------------------------------------------------------------------
+
+def _fake_telegram(script):
+    """Local HTTP server answering Bot API posts from `script`, a list of
+    (status, json_body, delay_s) consumed one per request (then 200 OK).
+    Returns (server, received) where received collects (time, method, form)."""
+    import json
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs
+
+    received = []
+    lock     = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            form = {k: v[0] for k, v in parse_qs(body.decode('utf-8', 'replace')).items()}
+            with lock:
+                received.append((time.monotonic(), self.path.rsplit('/', 1)[-1], form))
+                status, payload, delay = script.pop(0) if script else (200, {"ok": True}, 0)
+            time.sleep(delay)
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, received
+
+
+def bench_alert_dispatcher():
+    from alertDispatcher import AlertDispatcher
+
+    def dispatcher(server, **kw):
+        return AlertDispatcher(base_url=f"http://127.0.0.1:{server.server_port}",
+                               min_interval=0, max_per_sec=1000, retries=3, backoff=0.05, **kw)
+
+    # 429 honours retry_after, 5xx backs off exponentially, then succeeds
+    server, received = _fake_telegram([
+        (429, {"ok": False, "parameters": {"retry_after": 0.3}}, 0),
+        (502, {"ok": False}, 0),
+        (200, {"ok": True}, 0),
+    ])
+    d = dispatcher(server)
+    assert d.send_message("T", "chat", "retry me")
+    assert d.flush(5)
+    times = [t for t, _, _ in received]
+    assert len(received) == 3 and d.sent == 1 and d.failed == 0, (received, d.sent, d.failed)
+    assert times[1] - times[0] >= 0.3, "429 retry_after not honoured"
+    assert times[2] - times[1] >= 0.05 * 2, "5xx backoff not exponential"
+    server.shutdown()
+
+    # Other 4xx: dropped without retrying
+    server, received = _fake_telegram([(400, {"ok": False, "description": "bad"}, 0)])
+    d = dispatcher(server)
+    d.send_message("T", "chat", "bad request")
+    assert d.flush(5) and len(received) == 1 and d.failed == 1 and d.sent == 0
+    server.shutdown()
+
+    # Texts queued for one chat while the worker is busy go out as one message
+    server, received = _fake_telegram([(200, {"ok": True}, 0.3)])
+    d = dispatcher(server)
+    d.send_message("T", "chat", "first")
+    time.sleep(0.1)                                   # worker is inside the slow first post
+    for text in ("a", "b", "c"):
+        d.send_message("T", "chat", text)
+    assert d.flush(5)
+    texts = [form['text'] for _, _, form in received]
+    assert texts == ["first", "a\nb\nc"] and d.coalesced == 2, texts
+    server.shutdown()
+
+    # Full backlog drops the oldest pending item
+    server, received = _fake_telegram([(200, {"ok": True}, 0.3)])
+    d = dispatcher(server, maxsize=2)
+    d.send_message("T", "chat0", "busy")
+    time.sleep(0.1)
+    for i in range(1, 5):                             # different chats: no coalescing
+        d.send_message("T", f"chat{i}", f"m{i}")
+    assert d.flush(5)
+    chats = [form['chat_id'] for _, _, form in received]
+    assert chats == ["chat0", "chat3", "chat4"] and d.dropped == 2, chats
+    server.shutdown()
+
+    print(f"{'alert dispatcher':<28} 429/5xx retry, 4xx drop, coalescing, drop-oldest ok")
+
+
+BENCHMARKS = {
+    'candlebreakout':  bench_candlebreakout,
+    'sessions':        bench_sessions,
+    'moving_averages': bench_moving_averages,
+    'volume_profile':  bench_volume_profile,
+    'candles':         bench_candles,
+    'indicators':      bench_indicators,
+    'macd_structure':  bench_macd_structure,
+    'alert_dispatcher': bench_alert_dispatcher,
+}
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
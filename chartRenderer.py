@@ -0,0 +1,255 @@
+"""
+chartRenderer.py
+================
+Shared matplotlib drawing helpers and rendered-chart cache for the chart
+routes.
+
+draw_candlesticks renders a whole OHLC series as three artists — one
+LineCollection of wicks, one PolyCollection of bodies and (optionally) one
+LineCollection of doji ticks — instead of a Rectangle/bar plus a Line2D per
+bar, so a 400-bar chart costs three draw calls at savefig time.
+
+draw_colored_title lays out a title made of differently coloured segments
+in the same draw as the rest of the figure: each segment is anchored to the
+right edge of the one before it, so nothing has to be measured (and the
+figure redrawn) up front.
+
+ChartCache keeps finished PNGs (bytes + base64) keyed by symbol, interval,
+chart type and a fingerprint of the bars being drawn, so a dashboard refresh
+between bar closes skips matplotlib entirely.  LRU-evicted by entry count
+and total bytes.
+
+Configuration (environment, all optional):
+    CHART_CACHE_MAXSIZE   cached charts kept                 (default 64)
+    CHART_CACHE_MAXBYTES  total PNG bytes kept               (default 32 MB)
+
+Usage:
+    from chartRenderer import draw_candlesticks, get_chart_cache, chart_fingerprint
+    draw_candlesticks(ax, df.index, df['Open'], df['High'], df['Low'], df['Close'],
+                      width=pd.Timedelta(minutes=12))
+    draw_colored_title(ax, [("Risk: ", "white"), ("On", "purple")], fontsize=8)
+
+    key   = (symbol, interval, "scalp", chart_fingerprint(df))
+    chart = get_chart_cache().get_or_render(key, lambda: plot(df))
+    html_img = chart.b64
+"""
+
+import base64
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from matplotlib.collections import LineCollection, PolyCollection
+
+
+def draw_candlesticks(ax, x, opens, highs, lows, closes, width=0.6,
+                      up_color='green', down_color='red',
+                      up_edge=None, down_edge=None, edge_width=0,
+                      body_alpha=None, wick_color=None, wick_width=1.0, wick_alpha=None,
+                      doji_color=None, doji_width=2.0, zorder=2):
+    """
+    Draw candlesticks on `ax`.
+
+    Args:
+        x: bar positions — numbers or datetimes (DatetimeIndex, Timestamps)
+        opens, highs, lows, closes: OHLC arrays aligned with x
+        width: body width in x units (a timedelta when x holds datetimes)
+        up_color / down_color: body fill for close >= open / close < open
+        up_edge / down_edge: body outline colours (default: the fill colour)
+        wick_color: single wick colour; None colours each wick like its body
+        doji_color: if set, open == close bars get a horizontal tick of this
+            colour instead of a zero-height body
+        zorder: wicks are drawn at zorder, bodies and doji ticks at zorder + 1
+
+    Returns:
+        (wicks, bodies, dojis) collections; dojis is None when doji_color is None
+    """
+    # Datetime x: register the axis' date converter and draw in its units
+    ax.xaxis.update_units(x)
+    xs = np.asarray(ax.convert_xunits(x), dtype='float64')
+    if isinstance(width, (timedelta, np.timedelta64)):
+        width = pd.Timedelta(width) / pd.Timedelta(days=1)
+
+    o = np.asarray(opens,  dtype='float64')
+    h = np.asarray(highs,  dtype='float64')
+    l = np.asarray(lows,   dtype='float64')
+    c = np.asarray(closes, dtype='float64')
+    valid = np.isfinite(o) & np.isfinite(h) & np.isfinite(l) & np.isfinite(c)
+    xs, o, h, l, c = xs[valid], o[valid], h[valid], l[valid], c[valid]
+
+    up = c >= o
+    face = np.where(up, up_color, down_color)
+    edge = np.where(up, up_edge or up_color, down_edge or down_color)
+
+    # Wicks: one (x, low) -> (x, high) segment per bar
+    wick_segments = np.stack([np.column_stack([xs, l]), np.column_stack([xs, h])], axis=1)
+    wicks = LineCollection(wick_segments, colors=wick_color if wick_color is not None else face,
+                           linewidths=wick_width, alpha=wick_alpha, zorder=zorder)
+    ax.add_collection(wicks)
+
+    # Bodies: one rectangle per bar (doji bars become ticks when doji_color is set)
+    body = np.ones(len(xs), dtype=bool) if doji_color is None else (o != c)
+    left, right = xs - width / 2, xs + width / 2
+    bottom, top = np.minimum(o, c), np.maximum(o, c)
+    rects = np.stack([np.column_stack([left, bottom]), np.column_stack([right, bottom]),
+                      np.column_stack([right, top]), np.column_stack([left, top])], axis=1)
+    bodies = PolyCollection(rects[body], facecolors=face[body], edgecolors=edge[body],
+                            linewidths=edge_width, alpha=body_alpha, zorder=zorder + 1)
+    ax.add_collection(bodies)
+
+    dojis = None
+    if doji_color is not None:
+        doji = ~body
+        doji_segments = np.stack([np.column_stack([left[doji], c[doji]]),
+                                  np.column_stack([right[doji], c[doji]])], axis=1)
+        dojis = LineCollection(doji_segments, colors=doji_color, linewidths=doji_width,
+                               zorder=zorder + 1)
+        ax.add_collection(dojis)
+
+    ax.autoscale_view()
+    return wicks, bodies, dojis
+
+
+def draw_colored_title(ax, segments, pad=None, **text_kw):
+    """
+    Left-aligned axes title built from (text, color) segments laid end to
+    end.
+
+    The first segment is the real axes title (so tight_layout reserves room
+    for it and it follows the title's automatic placement); each following
+    segment is an annotation positioned off the previous segment's bounding
+    box at draw time.  Extra keyword arguments (fontsize, fontweight,
+    fontfamily, ...) apply to every segment.
+
+    Returns:
+        list of Text artists, one per segment
+    """
+    (first_text, first_color), rest = segments[0], segments[1:]
+    title = ax.set_title(first_text, color=first_color, loc='left', pad=pad, **text_kw)
+
+    artists = [title]
+    for text, color in rest:
+        artists.append(ax.annotate(text, xy=(1, 0), xycoords=artists[-1],
+                                   va='bottom', ha='left', color=color,
+                                   annotation_clip=False, **text_kw))
+    return artists
+
+
+# ---------------------------------------------------------------------------
+# Rendered chart cache
+# ---------------------------------------------------------------------------
+
+_FINGERPRINT_COLUMNS = ('unixtime', 'open', 'high', 'low', 'close')
+
+
+def chart_fingerprint(df, columns=None, rows=1, extra=()):
+    """Short hash of the last `rows` rows of df (index + columns) plus any
+    `extra` values that change the picture (levels, bar count, ...).
+
+    columns defaults to whichever of unixtime/open/high/low/close exist,
+    matched case-insensitively, so it works for both the Yahoo chart frames
+    and yfinance (Open/High/...) frames.
+    """
+    if columns is None:
+        lookup  = {str(col).lower(): col for col in df.columns}
+        columns = [lookup[name] for name in _FINGERPRINT_COLUMNS if name in lookup]
+    tail = df[list(columns)].tail(rows)
+    digest = hashlib.sha1(pd.util.hash_pandas_object(tail, index=True).to_numpy().tobytes())
+    digest.update(repr((len(df), extra)).encode())
+    return digest.hexdigest()
+
+
+class CachedChart:
+    """A rendered PNG, its base64 text and whatever the renderer returned
+    alongside it (trend labels etc.)."""
+    __slots__ = ('png', 'b64', 'meta')
+
+    def __init__(self, png, meta=None):
+        self.png  = png
+        self.b64  = base64.b64encode(png).decode('utf-8')
+        self.meta = meta or {}
+
+    def buffer(self):
+        """Fresh BytesIO over the PNG (for send_photo_alert and friends)."""
+        return io.BytesIO(self.png)
+
+    @property
+    def nbytes(self):
+        return len(self.png) + len(self.b64)
+
+
+class ChartCache:
+    def __init__(self, maxsize=None, maxbytes=None):
+        self.maxsize  = maxsize  or int(os.getenv("CHART_CACHE_MAXSIZE", 64))
+        self.maxbytes = maxbytes or int(os.getenv("CHART_CACHE_MAXBYTES", 32 * 1024 * 1024))
+        self._data    = OrderedDict()
+        self._nbytes  = 0
+        self._lock    = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            chart = self._data.get(key)
+            if chart is not None:
+                self._data.move_to_end(key)
+            return chart
+
+    def put(self, key, chart):
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._nbytes -= old.nbytes
+            if chart.nbytes > self.maxbytes:
+                return chart
+            self._data[key] = chart
+            self._nbytes += chart.nbytes
+            while len(self._data) > self.maxsize or self._nbytes > self.maxbytes:
+                _, evicted = self._data.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+        return chart
+
+    def get_or_render(self, key, render):
+        """Cached chart for key, else call render() and cache its result.
+
+        render() returns a PNG BytesIO (closed here), raw bytes, or a tuple
+        (buffer, meta_dict); None means nothing to draw and is not cached.
+        """
+        chart = self.get(key)
+        if chart is not None:
+            return chart
+
+        result = render()
+        meta = None
+        if isinstance(result, tuple):
+            result, meta = result
+        if result is None:
+            return None
+        if isinstance(result, io.BytesIO):
+            png = result.getvalue()
+            result.close()
+        else:
+            png = bytes(result)
+        return self.put(key, CachedChart(png, meta))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._nbytes = 0
+
+
+_chart_cache      = None
+_chart_cache_lock = threading.Lock()
+
+
+def get_chart_cache():
+    """Process-wide shared ChartCache."""
+    global _chart_cache
+    if _chart_cache is None:
+        with _chart_cache_lock:
+            if _chart_cache is None:
+                _chart_cache = ChartCache()
+    return _chart_cache
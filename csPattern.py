@@ -1,15 +1,19 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta, timezone
+from barRing import BarRing
 from dataManager import ServiceManager
 import gc
 import io
 
+_MACD_PATTERN_DTYPE = pd.CategoricalDtype(['Neutral', 'Bullish', 'Bearish'])
+
 
 class csPattern:
     def __init__(self):
         self.objMgr         = ServiceManager()
-        # DataFrames are stored only while needed and freed immediately after use
+        # Recent bars per interval (BarRing) are held only while needed and
+        # freed immediately after use
         self.data5m         = None
         self.data15m        = None
         self.data30m        = None
@@ -24,34 +28,44 @@ class csPattern:
     # ------------------------------------------------------------------
 
     def analyze_stockcandlesLTF(self, symbol):
-        """Fetch 5m/15m/30m, detect candlestick breakout patterns, then run
-        open/close signal logic.  DataFrames are freed as soon as possible."""
+        """Fetch 5m/15m/30m, detect candlestick breakout and MACD structure
+        patterns, then run open/close signal logic.  DataFrames are freed as soon as possible."""
+
+        # One 5m download; 15m/30m/1h are resampled from it locally
+        frames = self.objMgr.GetStockdata_MultiInterval(
+            symbol, ("5m", "15m", "30m", "1h"), indicatorList="macd"
+        )
+        if frames is None:
+            return
 
         # ---- 5m ----
-        self.data5m = self.objMgr.GetStockdata_Byinterval(symbol, "5m", indicatorList="macd")
+        self.data5m = frames.pop("5m")
         self.data5m = self._identify_candlebreakout_pattern(self.data5m)
+        self.data5m = self._identify_macd_structure(self.data5m)
         # EMA-5 on close — keep as float32
         self.data5m['ema5'] = (
             self.data5m['close'].ewm(span=5, adjust=False).mean()
             .round(2).astype('float32')
         )
-        self._trim_to_last_n(self.data5m, 25)   # only recent bars needed
+        self.data5m = BarRing.from_frame(self.data5m, 25)   # only recent bars needed
 
         # ---- 15m ----
-        self.data15m = self.objMgr.GetStockdata_Byinterval(symbol, "15m", indicatorList="macd")
+        self.data15m = frames.pop("15m")
         self.data15m = self._identify_candlebreakout_pattern(self.data15m)
+        self.data15m = self._identify_macd_structure(self.data15m)
         self.data15m['ema5'] = (self.data15m['close'].ewm(span=5, adjust=False).mean().round(2).astype('float32'))
-        self._trim_to_last_n(self.data15m, 20)
+        self.data15m = BarRing.from_frame(self.data15m, 20)
 
         # ---- 30m ----
-        self.data30m = self.objMgr.GetStockdata_Byinterval(symbol, "30m", indicatorList="macd")
+        self.data30m = frames.pop("30m")
         self.data30m = self._identify_candlebreakout_pattern(self.data30m)
-        self._trim_to_last_n(self.data30m, 10)
+        self.data30m = BarRing.from_frame(self._identify_macd_structure(self.data30m), 10)
 
         # ---- 1h ----
-        self.data1h = self.objMgr.GetStockdata_Byinterval(symbol, "1h", indicatorList="macd")
+        self.data1h = frames.pop("1h")
         self.data1h = self._identify_candlebreakout_pattern(self.data1h)
-        self._trim_to_last_n(self.data1h, 10)
+        self.data1h = BarRing.from_frame(self._identify_macd_structure(self.data1h), 10)
+        del frames
 
         gc.collect()
 
@@ -70,13 +84,16 @@ class csPattern:
 
     def analyze_stockcandlesHTF(self, symbol):
         """Fetch 1h/4h data for higher-timeframe market structure detection."""
-        self.data1h = self.objMgr.GetStockdata_Byinterval(symbol, "1h", indicatorList="rsi")
-        self.data1h = self._identify_candlebreakout_pattern(self.data1h)
-        self._trim_to_last_n(self.data1h, 10)
+        # Both timeframes come from the same 30m download
+        frames = self.objMgr.GetStockdata_MultiInterval(symbol, ("1h", "4h"), indicatorList="rsi")
+        if frames is None:
+            return None
 
-        self.data4h = self.objMgr.GetStockdata_Byinterval(symbol, "4h", indicatorList="rsi")
-        self.data4h = self._identify_candlebreakout_pattern(self.data4h)
-        self._trim_to_last_n(self.data4h, 5)
+        self.data1h = frames.pop("1h")
+        self.data1h = BarRing.from_frame(self._identify_candlebreakout_pattern(self.data1h), 10)
+
+        self.data4h = frames.pop("4h")
+        self.data4h = BarRing.from_frame(self._identify_candlebreakout_pattern(self.data4h), 5)
 
         gc.collect()
 
@@ -95,9 +112,9 @@ class csPattern:
         if self.data1h is None or len(self.data1h) < 2:
             return None
 
-        last_4h      = self.data4h.iloc[-1]
-        last_1h      = self.data1h.iloc[-1]
-        prev_1h      = self.data1h.iloc[-2]
+        last_4h      = self.data4h.last
+        last_1h      = self.data1h.last
+        prev_1h      = self.data1h.prev
 
         if (str(last_4h['cspattern']) == str(last_1h['cspattern'])
                 and str(last_1h['cspattern']) != str(prev_1h['cspattern'])):
@@ -119,16 +136,16 @@ class csPattern:
         self._structure_15m()
         self._structure_5m()
 
-        last_5m  = self.data5m.iloc[-1]
-        last_15m = self.data15m.iloc[-1]
-        last_30m = self.data30m.iloc[-1]
-        last_1h  = self.data1h.iloc[-1]
+        last_5m  = self.data5m.last
+        last_15m = self.data15m.last
+        last_30m = self.data30m.last
+        last_1h  = self.data1h.last
 
         macdpattern = "Neutral" 
-        macdpattern_5m = str(last_5m['macdpattern']) if 'macdpattern' in last_5m.index else "Neutral"
-        macdpattern_15m = str(last_15m['macdpattern']) if 'macdpattern' in last_15m.index else "Neutral"
-        macdpattern_30m = str(last_30m['macdpattern']) if 'macdpattern' in last_30m.index else "Neutral"
-        macdpattern_1h = str(last_1h['macdpattern']) if 'macdpattern' in last_1h.index else "Neutral"
+        macdpattern_5m = str(last_5m['macdpattern']) if 'macdpattern' in last_5m else "Neutral"
+        macdpattern_15m = str(last_15m['macdpattern']) if 'macdpattern' in last_15m else "Neutral"
+        macdpattern_30m = str(last_30m['macdpattern']) if 'macdpattern' in last_30m else "Neutral"
+        macdpattern_1h = str(last_1h['macdpattern']) if 'macdpattern' in last_1h else "Neutral"
 
         # Require 5m, 15m and 30M MACD to agree for a valid alert
         if macdpattern_5m == macdpattern_1h and macdpattern_5m == macdpattern_30m and macdpattern_5m == macdpattern_15m:
@@ -164,8 +181,8 @@ class csPattern:
         self._structure_30m()
         self._structure_15m()
 
-        last_30m  = self.data30m.iloc[-1]
-        last_15m = self.data15m.iloc[-1]
+        last_30m  = self.data30m.last
+        last_15m = self.data15m.last
 
         cur_pattern = str(last_15m['macdpattern'])
 
@@ -196,148 +213,109 @@ class csPattern:
             }
 
     # ------------------------------------------------------------------
-    # MACD pattern classification (only last 3 rows needed)
+    # MACD pattern classification (vectorised over the whole series)
     # ------------------------------------------------------------------
 
-    def _structure_from_tail(self, df):
-        """Extract MACD pattern using the last 3 rows of df."""
-        if df is None or len(df) < 3:
-            return "Neutral"
-        return self._structure_usingInputRows(df.iloc[-1], df.iloc[-2], df.iloc[-3])
+    def _structure_tail(self, ring):
+        """Ensure the ring has a macdpattern column; rings cut from a frame
+        that went through _identify_macd_structure already carry it."""
+        if 'macdpattern' in ring:
+            return
+        codes = self._structure_codes(ring.column('macd'), ring.column('msignal'),
+                                      ring.column('histogram'))
+        ring.add_column('macdpattern', _MACD_PATTERN_DTYPE.categories[codes], _MACD_PATTERN_DTYPE)
 
     def _structure_5m(self):
-        pattern = self._structure_from_tail(self.data5m)
-        if 'macdpattern' not in self.data5m.columns:
-            self.data5m['macdpattern'] = pd.Categorical(
-                ['Neutral'] * len(self.data5m),
-                categories=['Neutral', 'Bullish', 'Bearish']
-            )
-        self.data5m.iat[-1, self.data5m.columns.get_loc('macdpattern')] = pattern
+        self._structure_tail(self.data5m)
 
     def _structure_15m(self):
-        pattern = self._structure_from_tail(self.data15m)
-        if 'macdpattern' not in self.data15m.columns:
-            self.data15m['macdpattern'] = pd.Categorical(
-                ['Neutral'] * len(self.data15m),
-                categories=['Neutral', 'Bullish', 'Bearish']
-            )
-        self.data15m.iat[-1, self.data15m.columns.get_loc('macdpattern')] = pattern
+        self._structure_tail(self.data15m)
 
     def _structure_30m(self):
-        pattern = self._structure_from_tail(self.data30m)
-        if 'macdpattern' not in self.data30m.columns:
-            self.data30m['macdpattern'] = pd.Categorical(
-                ['Neutral'] * len(self.data30m),
-                categories=['Neutral', 'Bullish', 'Bearish']
-            )
-        self.data30m.iat[-1, self.data30m.columns.get_loc('macdpattern')] = pattern
+        self._structure_tail(self.data30m)
 
     def _structure_1h(self):
-        pattern = self._structure_from_tail(self.data1h)
-        if 'macdpattern' not in self.data1h.columns:
-            self.data1h['macdpattern'] = pd.Categorical(
-                ['Neutral'] * len(self.data1h),
-                categories=['Neutral', 'Bullish', 'Bearish']
-            )
-        self.data1h.iat[-1, self.data1h.columns.get_loc('macdpattern')] = pattern
+        self._structure_tail(self.data1h)
+
+    def _identify_macd_structure(self, df):
+        """macdpattern (Neutral/Bullish/Bearish) for every bar of df."""
+        if df is None or df.empty or 'histogram' not in df.columns:
+            return df
+        codes = self._structure_codes(df['macd'].to_numpy(), df['msignal'].to_numpy(),
+                                      df['histogram'].to_numpy())
+        df['macdpattern'] = pd.Categorical.from_codes(codes, dtype=_MACD_PATTERN_DTYPE)
+        return df
 
     @staticmethod
-    def _structure_usingInputRows(last_row, prev_row, prev2_row):
-        histogram = last_row['histogram']
+    def _structure_scores(macd, msignal, histogram, prev=None):
+        """(bullish, bearish) MACD structure scores of every bar, each bar
+        scored against the one before it (the first bar has no previous).
+        prev=(macd, msignal, histogram) supplies each bar's predecessor
+        explicitly instead (NaN for none)."""
+        m, s, h = np.asarray(macd), np.asarray(msignal), np.asarray(histogram)
+        if prev is None:
+            pm, ps, ph = (np.concatenate(([np.nan], a[:-1])).astype(a.dtype) for a in (m, s, h))
+        else:
+            pm, ps, ph = (np.asarray(a) for a in prev)
         noise_threshold = 0.005
-        
-        if abs(histogram) < 0.005:
-            return "Neutral"
-
-        timeframe = last_row['interval']
-        macd_value = last_row['macd']
-        macd_signal = last_row['msignal']
-        prev_macd = prev_row['macd']
-        prev_signal = prev_row['msignal']
-        prev_histogram = prev_row['histogram']
-        bullish_score = 0
-        bearish_score = 0
-        
+
         # ── 2. MACD vs Zero Line ──────────────────────────────────────────────────
-        if macd_value > 0:
-            bullish_score += 1
-        elif macd_value < 0:
-            bearish_score += 1
+        bullish = (m > 0).astype('int16')
+        bearish = (m < 0).astype('int16')
 
         # ── 3. MACD vs Signal Line ────────────────────────────────────────────────
-        gap     = abs(macd_value - macd_signal)
-        min_gap = noise_threshold * 0.5
-        if gap >= min_gap:
-            if macd_value > macd_signal:
-                bullish_score += 2
-            else:
-                bearish_score += 2
+        wide = np.abs(m - s) >= noise_threshold * 0.5
+        bullish += 2 * (wide & (m > s))
+        bearish += 2 * (wide & ~(m > s))
 
         # ── 4. Histogram Polarity ─────────────────────────────────────────────────
-        if histogram > 0:
-            bullish_score += 1
-        else:
-            bearish_score += 1
+        bullish += h > 0
+        bearish += ~(h > 0)
 
         # ── 5. Crossover Detection ────────────────────────────────────────────────
-        if prev_macd is not None and prev_signal is not None:
-            bullish_cross = prev_macd <= prev_signal and macd_value > macd_signal
-            bearish_cross = prev_macd >= prev_signal and macd_value < macd_signal
-
-            if bullish_cross:
-                if histogram <= 0:
-                    bullish_score += 1
-                else:
-                    bullish_score += 3
-
-            if bearish_cross:
-                if histogram >= 0:
-                    bearish_score += 1
-                else:
-                    bearish_score += 3
-
-            if prev_macd <= 0 and macd_value > 0:
-                bullish_score += 2
-            elif prev_macd >= 0 and macd_value < 0:
-                bearish_score += 2
+        bullish += np.where((pm <= ps) & (m > s), np.where(h <= 0, 1, 3), 0)
+        bearish += np.where((pm >= ps) & (m < s), np.where(h >= 0, 1, 3), 0)
+        zero_up  = (pm <= 0) & (m > 0)
+        bullish += 2 * zero_up
+        bearish += 2 * (~zero_up & (pm >= 0) & (m < 0))
 
         # ── 6. Histogram Momentum ─────────────────────────────────────────────────
-        if prev_histogram is not None:
-            hist_change = histogram - prev_histogram
-            if histogram > 0 and hist_change > 0:
-                bullish_score += 1
-            elif histogram > 0 and hist_change < 0:
-                bearish_score += 1
-            elif histogram < 0 and hist_change < 0:
-                bearish_score += 1
-            elif histogram < 0 and hist_change > 0:
-                bullish_score += 1
-
-            if prev_histogram < 0 and histogram > 0:
-                bullish_score += 2
-            elif prev_histogram > 0 and histogram < 0:
-                bearish_score += 2
-        
-        strong_threshold   = 3
+        hist_change = h - ph
+        moving = (h > 0) | (h < 0)
+        bullish += moving & (hist_change > 0)
+        bearish += moving & (hist_change < 0)
+        bullish += 2 * ((ph < 0) & (h > 0))
+        bearish += 2 * ((ph > 0) & (h < 0))
+
+        return bullish, bearish
+
+    @classmethod
+    def _structure_codes(cls, macd, msignal, histogram, prev=None):
+        """_MACD_PATTERN_DTYPE codes (0 Neutral, 1 Bullish, 2 Bearish) of
+        every bar.  The first two bars stay Neutral: a pattern needs three
+        (with an explicit prev the caller decides which bars qualify)."""
+        histogram = np.asarray(histogram)
+        bullish, bearish = cls._structure_scores(macd, msignal, histogram, prev)
         moderate_threshold = 2
-        total_score = bullish_score + bearish_score
-        net_score   = bullish_score - bearish_score
-
-        trend = "Neutral"
-        if net_score > moderate_threshold:
-            trend = "Bullish"   # "Moderate"
-        elif net_score >= 0:
-            trend = "Neutral"   # "No clear bias"
-        elif net_score >= -moderate_threshold:
-            trend = "Neutral"   # "Weak bearish"
-        else:
-            trend = "Bearish" # Strong
-        gc.collect()
-
-        return trend
+        net_score = bullish - bearish
+
+        codes = np.where(net_score > moderate_threshold, 1,
+                         np.where(net_score >= -moderate_threshold, 0, 2)).astype('int8')
+        codes[np.abs(histogram) < 0.005] = 0
+        if prev is None:
+            codes[:2] = 0
+        return codes
+
+    @classmethod
+    def _structure_usingInputRows(cls, last_row, prev_row, prev2_row):
+        """MACD pattern of last_row — the vectorised scorer over three bars."""
+        rows  = (prev2_row, prev_row, last_row)
+        codes = cls._structure_codes(*(np.array([row[col] for row in rows])
+                                       for col in ('macd', 'msignal', 'histogram')))
+        return _MACD_PATTERN_DTYPE.categories[codes[-1]]
 
     # ------------------------------------------------------------------
-    # Candlestick pattern identification (vectorised where possible)
+    # Candlestick pattern identification (vectorised)
     # ------------------------------------------------------------------
 
     def _identify_candlebreakout_pattern(self, df, engulfFlag=True, fvgFlag=True):
@@ -366,54 +344,40 @@ class csPattern:
         highs  = df['high'].to_numpy(dtype='float32')
         lows   = df['low'].to_numpy(dtype='float32')
         closes = df['close'].to_numpy(dtype='float32')
-        idx    = df.index
-
-        # Build result arrays, then assign in bulk — much faster & less memory
-        cspattern_arr    = np.full(n, 'Neutral', dtype=object)
-        cstwopattern_arr = np.full(n, 'na',      dtype=object) if engulfFlag else None
-        csfvgpattern_arr = np.full(n, 'na',      dtype=object) if fvgFlag    else None
-
-        # Carry-forward signal (propagate from previous bar)
-        cspattern_arr[0] = 'Neutral'
-        for i in range(1, n):
-            o, h, l, c    = opens[i],   highs[i],   lows[i],   closes[i]
-            o1, h1, l1, c1 = opens[i-1], highs[i-1], lows[i-1], closes[i-1]
-
-            # Sentiment carry-forward + change
-            sig = cspattern_arr[i-1]
-            if c > h1:
-                sig = 'Bullish'
-            elif c < l1:
-                sig = 'Bearish'
-            cspattern_arr[i] = sig
-
-            # Engulfing patterns
-            if engulfFlag:
-                if c > o and c1 < o1 and c > o1 and o < c1:
-                    cstwopattern_arr[i] = 'UlEngulf'
-                elif c < o and c1 > o1 and c < o1 and o > c1:
-                    cstwopattern_arr[i] = 'EaEngulf'
-
-            # Fair Value Gap (needs i >= 2)
-            if fvgFlag and i >= 2:
-                h2 = highs[i-2]
-                l2 = lows[i-2]
-                if l2 > h:
-                    csfvgpattern_arr[i] = 'EaFVG'
-                elif h2 < l:
-                    csfvgpattern_arr[i] = 'UlFVG'
-
-        # Bulk assignment — one DataFrame write per column
-        df['cspattern'] = pd.Categorical(cspattern_arr, categories=['Neutral', 'Bullish', 'Bearish'])
+
+        # Current bar vs previous bar, aligned on positions 1..n-1
+        o,  h,  l,  c  = opens[1:],  highs[1:],  lows[1:],  closes[1:]
+        o1, h1, l1, c1 = opens[:-1], highs[:-1], lows[:-1], closes[:-1]
+
+        # Sentiment carry-forward: each break of the previous high/low sets
+        # the signal, which then holds until the next break (forward fill)
+        event = np.zeros(n, dtype='int8')                 # 0 Neutral, 1 Bullish, 2 Bearish
+        event[1:] = np.where(c > h1, 1, np.where(c < l1, 2, 0))
+        last_break = np.maximum.accumulate(np.where(event != 0, np.arange(n), 0))
+        df['cspattern'] = pd.Categorical.from_codes(
+            event[last_break], categories=['Neutral', 'Bullish', 'Bearish']
+        )
+
+        # Engulfing patterns
         if engulfFlag:
-            df['cstwopattern'] = pd.Categorical(cstwopattern_arr, categories=['na', 'UlEngulf', 'EaEngulf'])
+            codes = np.zeros(n, dtype='int8')             # 0 na, 1 UlEngulf, 2 EaEngulf
+            codes[1:] = np.where((c > o) & (c1 < o1) & (c > o1) & (o < c1), 1,
+                        np.where((c < o) & (c1 > o1) & (c < o1) & (o > c1), 2, 0))
+            df['cstwopattern'] = pd.Categorical.from_codes(
+                codes, categories=['na', 'UlEngulf', 'EaEngulf']
+            )
+
+        # Fair Value Gap (needs i >= 2)
         if fvgFlag:
-            df['csfvgpattern'] = pd.Categorical(csfvgpattern_arr, categories=['na', 'EaFVG', 'UlFVG'])
+            codes = np.zeros(n, dtype='int8')             # 0 na, 1 EaFVG, 2 UlFVG
+            if n > 2:
+                h2, l2 = highs[:-2], lows[:-2]
+                codes[2:] = np.where(l2 > highs[2:], 1, np.where(h2 < lows[2:], 2, 0))
+            df['csfvgpattern'] = pd.Categorical.from_codes(
+                codes, categories=['na', 'EaFVG', 'UlFVG']
+            )
 
-        del opens, highs, lows, closes
-        del cspattern_arr
-        if cstwopattern_arr is not None: del cstwopattern_arr
-        if csfvgpattern_arr is not None: del csfvgpattern_arr
+        del opens, highs, lows, closes, event, last_break
 
         return df
 
@@ -472,14 +436,14 @@ class csPattern:
         1766001600     12   17   15     00 26.10    31.96 673.12 672.52 673.32 672.24      30m    SPY   Bullish           na           na
         1766003400     12   17   15     30 22.72    30.73 672.53 671.30 673.00 671.20      30m    SPY   Bearish           na           na
         """
-        self.data30m = self._sampledata_toDF(data_30m, is5m=False)
+        self.data30m = BarRing.from_frame(self._sampledata_toDF(data_30m, is5m=False))
 
         data_15m = """
         1766002500     12   17   15     15 30.06    29.77 672.76 672.52 673.24 672.24    SPY      15m   Bullish           na           na
         1766003400     12   17   15     30 33.26    30.24 672.53 672.79 672.90 671.95    SPY      15m   Bullish           na           na
         1766004300     12   17   15     45 26.16    29.69 672.79 671.30 673.00 671.20    SPY      15m   Bearish           na           na
         """
-        self.data15m = self._sampledata_toDF(data_15m, is5m=False)
+        self.data15m = BarRing.from_frame(self._sampledata_toDF(data_15m, is5m=False))
 
         data_5m = """
         1766003100     12   17   15     25 42.04    44.01 672.95 672.52 672.95 672.24    SPY       5m   Bearish           na           na     672.75
@@ -490,7 +454,7 @@ class csPattern:
         1766004600     12   17   15     50 36.97    43.64 672.95 671.79 673.00 671.61    SPY       5m   Bearish           na           na     672.46
         1766004900     12   17   15     55 32.91    42.21 671.79 671.30 671.79 671.20    SPY       5m   Bearish           na        EaFVG     672.22
         """
-        self.data5m = self._sampledata_toDF(data_5m, is5m=True)
+        self.data5m = BarRing.from_frame(self._sampledata_toDF(data_5m, is5m=True))
 
     @staticmethod
     def _sampledata_toDF(data, is5m):
@@ -3,6 +3,14 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta, timezone
 import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from barRing import BarRing
+from httpClient import get_http_client
+from indicatorEngine import get_indicator_engine
+from timeParts import local_dates, minute_mask, padded_category, time_parts
 
 # Only the columns needed after processing — avoids carrying dead weight
 _FINAL_COLS_MACD = ['unixtime', 'nmonth', 'nday', 'hour', 'minute',
@@ -12,6 +20,96 @@ _FINAL_COLS_RSI  = ['unixtime', 'nmonth', 'nday', 'hour', 'minute',
                     'rsi', 'rsignal', 'crossover', 'open', 'close', 'high', 'low',
                     'interval', 'symbol']
 
+# Bar length per interval, and the downloaded series each interval is built
+# from (1h/4h have always been resampled from 30m bars)
+_INTERVAL_MINUTES = {"1m": 1, "5m": 5, "15m": 15, "30m": 30, "1h": 60, "4h": 240}
+_BASE_INTERVAL    = {"1m": "1m", "5m": "5m", "15m": "15m", "30m": "30m", "1h": "30m", "4h": "30m"}
+_EPOCH            = pd.Timestamp(0, tz='UTC')
+_ANALYZE_INTERVALS = ("5m", "15m", "30m", "1h", "4h")
+_USE_INDICATOR_ENGINE = os.getenv("INDICATOR_ENGINE", "1") != "0"
+
+
+class BarCache:
+    """In-process cache of downloaded bar frames keyed by
+    (symbol, interval, aligned bar end).  A frame is served until the next
+    5m bar closes — at which point the key changes — or until it is older
+    than `ttl` seconds.  The least recently used entry is evicted once
+    `maxsize` entries are held.  Frames go in and come out as copies, so
+    callers are free to mutate what they get back.
+    """
+
+    def __init__(self, maxsize=None, ttl=None):
+        self.maxsize = maxsize or int(os.getenv("BAR_CACHE_MAXSIZE", 64))
+        self.ttl     = ttl     or float(os.getenv("BAR_CACHE_TTL", 300))
+        self._data   = OrderedDict()     # key -> (stored_at, DataFrame)
+        self._lock   = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            stored_at, df = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return df.copy()
+
+    def put(self, key, df):
+        with self._lock:
+            self._data[key] = (time.monotonic(), df.copy())
+            self._data.move_to_end(key)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in [k for k, (t, _) in self._data.items() if now - t > self.ttl]:
+            del self._data[key]
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+class BarStore:
+    """Rolling per-(symbol, interval) bar history used for delta fetches.
+    Each entry remembers the earliest time its history is complete from, so
+    a request reaching further back triggers one full download and every
+    later request only asks Yahoo for bars from the last cached bar onwards.
+    The least recently used symbol is dropped once `maxsize` entries exist.
+    """
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize or int(os.getenv("BAR_STORE_MAXSIZE", 64))
+        self._data   = OrderedDict()     # key -> (covered_from, span, DataFrame)
+        self._lock   = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def put(self, key, covered_from, span, df):
+        with self._lock:
+            self._data[key] = (covered_from, span, df)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# Shared by every ServiceManager instance (routes build their own instances)
+_bar_cache = BarCache()
+_bar_store = BarStore()
+
 
 class ServiceManager:
     def __init__(self):
@@ -22,179 +120,74 @@ class ServiceManager:
     # ------------------------------------------------------------------
 
     def analyze_stockdata(self, symbol):
-        todayn     = datetime.now().strftime('%d')
-        yesterdayn = (datetime.now() - timedelta(days=1)).strftime('%d')
-
-        # 5m: keep only today's last 20 rows right after fetch
-        data5m    = self.GetStockdata_Byinterval(symbol, "5m", indicatorList="macd")
-        df_merged = data5m[data5m['nday'] == todayn].tail(20).copy()
-        del data5m
-        gc.collect()
-
-        # Fetch 15m / 30m / 1h once, slice immediately after each use
-        data15m = self.GetStockdata_Byinterval(symbol, "15m", indicatorList="macd")
-        data30m = self.GetStockdata_Byinterval(symbol, "30m", indicatorList="macd")
-        data1h  = self.GetStockdata_Byinterval(symbol, "1h",  indicatorList="macd")
-
-        #data15m  = self.calculate_Buy_Sell_Values(data15m, data30m, 65)
-        slice15  = data15m[data15m['nday'] == todayn].tail(12).copy()
-        slice15 = self.calculate_TrendAlert(slice15)
-        del data15m
-        gc.collect()
-
-        #data30m  = self.calculate_Buy_Sell_Values(data30m, data1h, 125)
-        slice30  = data30m[data30m['nday'] == todayn].tail(8).copy()
-        slice30 = self.calculate_TrendAlert(slice30)
-        del data30m
-        gc.collect()
-
-        slice1h  = data1h[data1h['nday'] == todayn].tail(4).copy()
-        slice1h = self.calculate_TrendAlert(slice1h)
-        del data1h
-        gc.collect()
-
-        # 4h: only last 3 rows, then filter to today/yesterday
-        data4h  = self.GetStockdata_Byinterval(symbol, "4h", indicatorList="macd").tail(3)
-        slice4h = data4h[(data4h['nday'] == todayn) | (data4h['nday'] == yesterdayn)].copy()
-        slice4h = self.calculate_TrendAlert(slice4h)
-        if len(slice4h) == 0:
-            slice4h = data4h.copy()
-        del data4h
-        gc.collect()
-
-        df_merged = pd.concat(
-            [df_merged, slice4h, slice1h, slice30, slice15 ],
-            ignore_index=True
-        )
-        del slice15, slice30, slice1h, slice4h
-        gc.collect()
-
-        return df_merged
+        # One 5m download per symbol — 15m/30m/1h/4h are resampled locally
+        frames = self.GetStockdata_MultiInterval(symbol, _ANALYZE_INTERVALS, indicatorList="macd")
+        if frames is None:
+            return None
+        return self._merge_analysis(frames)
 
     def GetStockdata_Byinterval(self, symbol, interval="1d", indicatorList="macd"):
-        stPeriod  = int((datetime.now() - timedelta(days=4)).timestamp())
-        endPeriod = datetime.now()
-        rem = endPeriod.minute % 5
-        endPeriod = endPeriod.replace(minute=endPeriod.minute - rem, second=0, microsecond=0)
+        endPeriod = self._aligned_endperiod()
 
-        df = self.download_stock_data(symbol, stPeriod, endPeriod.timestamp(), interval)
+        df = self._download_cached(symbol, endPeriod, interval)
         if df is None:
             print("Failed to fetch data. Please check your internet connection.")
             return None
 
-        # ---- interval-specific trimming / resampling ----
-        if interval == "5m":
-            valid_min = {"00","05","10","15","20","25","30","35","40","45","50","55"}
-            mask = (df['unixtime'] <= endPeriod.timestamp()) & df['minute'].isin(valid_min)
-            df   = df.loc[mask].copy()
+        df = self._trim_to_interval(df, interval, endPeriod)
+        return self._finalize_interval(df, symbol, interval, indicatorList)
 
-        elif interval == "15m":
-            rem15 = endPeriod.minute % 15
-            ep    = endPeriod.replace(minute=endPeriod.minute - rem15, second=0, microsecond=0).timestamp() - 1
-            df    = df.loc[(df['unixtime'] <= ep) & df['minute'].isin({"00","15","30","45"})].copy()
+    def GetStockdata_MultiInterval(self, symbol, intervals=("5m", "15m", "30m", "1h", "4h"),
+                                   indicatorList="macd"):
+        """Multi-timeframe mode: download the finest requested series once and
+        build every coarser interval locally.  Returns {interval: DataFrame}
+        with the same shape GetStockdata_Byinterval produces per interval,
+        or None when the download fails.
+        """
+        base_interval = self._finest_base(intervals)
+        endPeriod = self._aligned_endperiod()
 
-        elif interval == "30m":
-            rem30 = endPeriod.minute % 30
-            ep    = endPeriod.replace(minute=endPeriod.minute - rem30, second=0, microsecond=0).timestamp() - 1
-            df    = df.loc[(df['unixtime'] <= ep) & df['minute'].isin({"00","30"})].copy()
+        base = self._download_cached(symbol, endPeriod, base_interval)
+        if base is None:
+            print("Failed to fetch data. Please check your internet connection.")
+            return None
 
-        elif interval == "1h":
-            df = (
-                df.resample('1h', origin='epoch')
-                .agg({'unixtime':'first','open':'first','high':'max','low':'min','close':'last'})
-                .dropna()
-            )
-            ep = endPeriod.replace(minute=0, second=0, microsecond=0).timestamp()
-            df = self._attach_dt_cols(df)
-            df = df[df['unixtime'] <= ep].copy()
+        return self._build_intervals(base, base_interval, symbol, intervals, endPeriod, indicatorList)
 
-        elif interval == "4h":
-            df  = df[df['minute'].isin({"00"})].copy()
-            rem4 = endPeriod.hour % 4
-            ep   = endPeriod.replace(
-                hour=endPeriod.hour - rem4, minute=0, second=0, microsecond=0
-            ).timestamp() - 1
-            df = df[df['unixtime'] <= ep].copy()
-            df = (
-                df.resample('4h', origin='epoch',offset='3h', closed='right', label='right')
-                .agg({'unixtime':'first','open':'first','high':'max','low':'min','close':'last'})
-                .dropna()
-            )
-            df = self._attach_dt_cols(df)
+    def download_stock_data_incremental(self, symbol, startPeriod, endPeriod, interval="5m"):
+        """Same frame as download_stock_data, but served from the rolling
+        BarStore: only bars from the last cached bar onwards are requested.
+        The last cached bar may have been partial, so it is re-fetched and
+        replaced together with anything newer.  Intervals without a fixed
+        bar length fall through to a plain download.
+        """
+        if interval not in _INTERVAL_MINUTES:
+            return self.download_stock_data(symbol, startPeriod, endPeriod, interval)
 
-        # ---- compute indicators in-place (no copy) ----
-        if "macd" in indicatorList:
-            df = self._calculate_macd_inplace(df)
-        if "rsi" in indicatorList:
-            df = self._calculate_rsi_inplace(df)
+        startPeriod, endPeriod = int(startPeriod), int(endPeriod)
+        key, entry, period1 = self._delta_plan(symbol, startPeriod, interval)
 
-        # ---- drop every column we don't need ----
-        want = _FINAL_COLS_MACD if "macd" in indicatorList else _FINAL_COLS_RSI
-        keep = [c for c in want if c in df.columns]
-        size = len(df)
-        if size > 4:
-            size = 4
-        df_sel = df[keep].tail(5).copy()
-        del df
-        gc.collect()
+        df = None
+        if entry is not None:
+            delta = self.download_stock_data(symbol, period1, endPeriod, interval)
+            df    = self._merge_delta(key, entry, startPeriod, endPeriod, period1, delta)
 
-        sym_clean        = symbol.replace("%3DF", "")
-        df_sel['interval'] = pd.Categorical([interval]  * len(df_sel))
-        df_sel['symbol']   = pd.Categorical([sym_clean] * len(df_sel))
+        if df is None:
+            df = self.download_stock_data(symbol, startPeriod, endPeriod, interval)
+            if df is None:
+                return None
+            _bar_store.put(key, startPeriod, endPeriod - startPeriod, df)
 
-        return df_sel
+        return df[df['unixtime'] >= startPeriod].copy()
 
     def download_stock_data(self, symbol, startPeriod, endPeriod, interval="1d"):
         """Fetch OHLCV from Yahoo Finance. Returns DataFrame with tz-aware index."""
-        if interval in ("4h", "1h"):
-            interval = "30m"
-
-        url    = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-        params = {
-            'period1':        int(startPeriod),
-            'period2':        int(endPeriod),
-            'interval':       interval,
-            'includePrePost': 'true',
-        }
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+        url, params = self._chart_request(symbol, startPeriod, endPeriod, interval)
 
         try:
-            resp = requests.get(url, params=params, headers=headers, timeout=15)
+            resp = get_http_client().get(url, params=params)
             resp.raise_for_status()
-            data   = resp.json()
-            result = data['chart']['result'][0]
-            quotes = result['indicators']['quote'][0]
-
-            # Keep timestamps as int64 for pd.to_datetime — int32 overflows
-            # silently producing NaT, which cascades into NaN for all derived
-            # datetime columns.  Downcast to int32 only AFTER derivation.
-            ts_arr = np.asarray(result['timestamp'], dtype='int64')
-
-            df = pd.DataFrame({
-                'unixtime': ts_arr,
-                'open':  np.round(np.asarray(quotes['open'],  dtype='float32'), 2),
-                'high':  np.round(np.asarray(quotes['high'],  dtype='float32'), 2),
-                'low':   np.round(np.asarray(quotes['low'],   dtype='float32'), 2),
-                'close': np.round(np.asarray(quotes['close'], dtype='float32'), 2),
-            })
-            df.dropna(inplace=True)
-            df.reset_index(drop=True, inplace=True)
-
-            # Derive datetime columns while unixtime is still int64
-            ts = (
-                pd.to_datetime(df['unixtime'], unit='s')
-                .dt.tz_localize('UTC')
-                .dt.tz_convert('America/New_York')
-            )
-            df.index      = ts
-            df.index.name = 'timestamp'
-            df['rec_dt'] = ts.dt.date.values
-            # Now safe to downcast unixtime to int32
-            df['unixtime'] = df['unixtime'].astype('int32')
-            df = self._attach_dt_cols(df)
-            del ts
-
-            return df
+            return self._parse_chart(resp.json())
 
         except requests.exceptions.RequestException as e:
             print(f"Error fetching data: {e}")
@@ -203,13 +196,30 @@ class ServiceManager:
         return None
 
     def calculate_TrendAlert(self, dfcur):
+        """MACD trend score of the last bar in 'crossover' ('0' elsewhere).
+        Accepts a DataFrame or a BarRing; only the last two bars are read,
+        as plain scalars."""
+        if isinstance(dfcur, BarRing):
+            dfcur.add_column('crossover', '0')
+            if len(dfcur) >= 2:
+                dfcur.set('crossover', self._trend_score(dfcur.last, dfcur.prev))
+            return dfcur
+
         dfcur['crossover'] = '0'
         if dfcur is None or dfcur.empty or len(dfcur) < 2:
             return dfcur
-        
+
+        last_row, last_but_second_row = (
+            {col: dfcur[col].to_numpy()[i] for col in ('macd', 'msignal', 'histogram')}
+            for i in (-1, -2)
+        )
+        dfcur.loc[dfcur.index[-1], 'crossover'] = self._trend_score(last_row, last_but_second_row)
+        return dfcur
+
+    @staticmethod
+    def _trend_score(last_row, last_but_second_row):
         bullish_score = 0
         bearish_score = 0
-        last_row, last_but_second_row = dfcur.iloc[-1], dfcur.iloc[-2]
         if (last_row['macd'] > 0 and last_row['msignal'] > 0):
             bullish_score += 1
         elif (last_row['macd'] < 0 and last_row['msignal'] < 0):
@@ -225,8 +235,7 @@ class ServiceManager:
         elif (last_row['macd'] < last_but_second_row['macd']):
             bearish_score += 1
 
-        dfcur.loc[dfcur.index[-1], 'crossover'] = str(bullish_score-bearish_score)
-        return dfcur
+        return str(bullish_score-bearish_score)
 
     def calculate_RSITrendAlert(self, dfcur):
         dfcur['rsicrossover'] = '0'
@@ -384,23 +393,275 @@ class ServiceManager:
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _attach_dt_cols(df):
-        """Re-attach nmonth/nday/hour/minute from unixtime after a resample.
-        Must use int64 for pd.to_datetime — int32 overflows and produces NaT.
-        Downcasts unixtime to int32 after derivation to save memory.
-        """
-        dt_ny = (
-            pd.to_datetime(df['unixtime'].astype('int64'), unit='s')
+    def _aligned_endperiod():
+        """Current local time floored to the last 5-minute boundary."""
+        endPeriod = datetime.now()
+        rem = endPeriod.minute % 5
+        return endPeriod.replace(minute=endPeriod.minute - rem, second=0, microsecond=0)
+
+    def _download_cached(self, symbol, endPeriod, interval):
+        """4-day download ending at endPeriod, served from the shared
+        BarCache while the current 5m bar is still open."""
+        key, stPeriod = self._cache_plan(symbol, endPeriod, interval)
+        df = _bar_cache.get(key)
+        if df is not None:
+            return df
+
+        df = self.download_stock_data_incremental(symbol, stPeriod, endPeriod.timestamp(), key[1])
+        if df is not None:
+            _bar_cache.put(key, df)
+        return df
+
+    @staticmethod
+    def _cache_plan(symbol, endPeriod, interval):
+        """BarCache key and 4-day window start for a download ending at endPeriod."""
+        dl_interval = _BASE_INTERVAL.get(interval, interval)
+        key = (symbol, dl_interval, int(endPeriod.timestamp()))
+        stPeriod = int((datetime.now() - timedelta(days=4)).timestamp())
+        return key, stPeriod
+
+    @staticmethod
+    def _delta_plan(symbol, startPeriod, interval):
+        """Look up the BarStore entry for a delta fetch.  Returns
+        (key, entry, period1); entry is None when a full download is needed."""
+        key   = (symbol, interval)
+        entry = _bar_store.get(key)
+        if entry is None or entry[0] > startPeriod or entry[2].empty:
+            return key, None, startPeriod
+        bar_secs = _INTERVAL_MINUTES[interval] * 60
+        last_ts  = int(entry[2]['unixtime'].iloc[-1])
+        return key, entry, last_ts - last_ts % bar_secs      # start of the last cached bar
+
+    @staticmethod
+    def _merge_delta(key, entry, startPeriod, endPeriod, period1, delta):
+        """Replace everything from period1 onwards with the delta and store
+        the result.  Returns None when the delta download failed."""
+        if delta is None:
+            return None
+        covered_from, span, hist = entry
+        hist = hist[hist['unixtime'] < period1]
+        if not delta.empty:
+            hist = hist[hist['unixtime'] < int(delta['unixtime'].iloc[0])]
+        df = pd.concat([hist, delta])
+        for col in ('nmonth', 'nday', 'hour', 'minute'):
+            df[col] = df[col].astype('category')
+        # keep a rolling window as wide as the widest request seen
+        covered_from = max(covered_from, min(startPeriod, endPeriod - span))
+        df = df[df['unixtime'] >= covered_from]
+        _bar_store.put(key, covered_from, span, df)
+        return df
+
+    @staticmethod
+    def _chart_request(symbol, startPeriod, endPeriod, interval):
+        """URL and query params for the Yahoo v8 chart endpoint."""
+        if interval in ("4h", "1h"):
+            interval = "30m"
+        url    = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
+        params = {
+            'period1':        int(startPeriod),
+            'period2':        int(endPeriod),
+            'interval':       interval,
+            'includePrePost': 'true',
+        }
+        return url, params
+
+    def _parse_chart(self, data):
+        """Chart JSON -> OHLC frame with tz-aware ET index and dt columns."""
+        result = data['chart']['result'][0]
+        quotes = result['indicators']['quote'][0]
+
+        # Keep timestamps as int64 for pd.to_datetime — int32 overflows
+        # silently producing NaT, which cascades into NaN for all derived
+        # datetime columns.  Downcast to int32 only AFTER derivation.
+        ts_arr = np.asarray(result['timestamp'], dtype='int64')
+
+        df = pd.DataFrame({
+            'unixtime': ts_arr,
+            'open':  np.round(np.asarray(quotes['open'],  dtype='float32'), 2),
+            'high':  np.round(np.asarray(quotes['high'],  dtype='float32'), 2),
+            'low':   np.round(np.asarray(quotes['low'],   dtype='float32'), 2),
+            'close': np.round(np.asarray(quotes['close'], dtype='float32'), 2),
+        })
+        df.dropna(inplace=True)
+        df.reset_index(drop=True, inplace=True)
+
+        # Derive datetime columns while unixtime is still int64
+        ts = (
+            pd.to_datetime(df['unixtime'], unit='s')
             .dt.tz_localize('UTC')
             .dt.tz_convert('America/New_York')
         )
-        df['rec_dt'] = dt_ny.dt.date
-        df['nmonth'] = dt_ny.dt.strftime('%m').astype('category')
-        df['nday']   = dt_ny.dt.strftime('%d').astype('category')
-        df['hour']   = dt_ny.dt.strftime('%H').astype('category')
-        df['minute'] = dt_ny.dt.strftime('%M').astype('category')
+        df.index      = ts
+        df.index.name = 'timestamp'
+        # rec_dt and the dt parts; unixtime is downcast to int32 after
+        df = self._attach_dt_cols(df)
+        del ts
+
+        return df
+
+    @staticmethod
+    def _finest_base(intervals):
+        """Download interval every requested interval can be built from."""
+        return min((_BASE_INTERVAL[i] for i in intervals), key=_INTERVAL_MINUTES.get)
+
+    def _build_intervals(self, base, base_interval, symbol, intervals, endPeriod, indicatorList):
+        """Resample, trim and finalize every requested interval from `base`."""
+        frames = {}
+        for interval in intervals:
+            df = self._resample_from_base(base, base_interval, _BASE_INTERVAL[interval])
+            df = self._trim_to_interval(df, interval, endPeriod)
+            frames[interval] = self._finalize_interval(df, symbol, interval, indicatorList)
+        del base
+        gc.collect()
+
+        return frames
+
+    def _merge_analysis(self, frames):
+        """Slice today's rows per timeframe, score the trend and stack them
+        into the frame analyze_stockdata returns.  Slicing and scoring run on
+        BarRings; the one DataFrame is built at the end."""
+        todayn     = datetime.now().strftime('%d')
+        yesterdayn = (datetime.now() - timedelta(days=1)).strftime('%d')
+        rings = {interval: BarRing.from_frame(frames.pop(interval))
+                 for interval in ("5m", "15m", "30m", "1h", "4h")}
+        del frames
+
+        def today(ring, n):
+            return ring.select(ring.column('nday') == todayn).tail(n)
+
+        # 5m: keep only today's last 20 rows
+        slice5   = today(rings["5m"], 20)
+
+        #data15m  = self.calculate_Buy_Sell_Values(data15m, data30m, 65)
+        slice15  = self.calculate_TrendAlert(today(rings["15m"], 12))
+
+        #data30m  = self.calculate_Buy_Sell_Values(data30m, data1h, 125)
+        slice30  = self.calculate_TrendAlert(today(rings["30m"], 8))
+
+        slice1h  = self.calculate_TrendAlert(today(rings["1h"], 4))
+
+        # 4h: only last 3 rows, then filter to today/yesterday
+        data4h  = rings["4h"].tail(3)
+        slice4h = self.calculate_TrendAlert(data4h.select(np.isin(data4h.column('nday'), (todayn, yesterdayn))))
+        if len(slice4h) == 0:
+            slice4h = data4h
+        del rings, data4h
+        gc.collect()
+
+        df_merged = pd.concat(
+            [ring.to_frame() for ring in (slice5, slice4h, slice1h, slice30, slice15)],
+            ignore_index=True
+        )
+        del slice5, slice15, slice30, slice1h, slice4h
+        gc.collect()
+
+        return df_merged
+
+    def _trim_to_interval(self, df, interval, endPeriod):
+        """Interval-specific trimming / resampling of a downloaded frame."""
+        if interval == "5m":
+            mask = (df['unixtime'] <= endPeriod.timestamp()) & minute_mask(df['unixtime'], 5)
+            df   = df.loc[mask].copy()
+
+        elif interval == "15m":
+            rem15 = endPeriod.minute % 15
+            ep    = endPeriod.replace(minute=endPeriod.minute - rem15, second=0, microsecond=0).timestamp() - 1
+            df    = df.loc[(df['unixtime'] <= ep) & minute_mask(df['unixtime'], 15)].copy()
+
+        elif interval == "30m":
+            rem30 = endPeriod.minute % 30
+            ep    = endPeriod.replace(minute=endPeriod.minute - rem30, second=0, microsecond=0).timestamp() - 1
+            df    = df.loc[(df['unixtime'] <= ep) & minute_mask(df['unixtime'], 30)].copy()
+
+        elif interval == "1h":
+            df = (
+                df.resample('1h', origin='epoch')
+                .agg({'unixtime':'first','open':'first','high':'max','low':'min','close':'last'})
+                .dropna()
+            )
+            ep = endPeriod.replace(minute=0, second=0, microsecond=0).timestamp()
+            df = self._attach_dt_cols(df)
+            df = df[df['unixtime'] <= ep].copy()
+
+        elif interval == "4h":
+            df  = df[minute_mask(df['unixtime'], 60)].copy()
+            rem4 = endPeriod.hour % 4
+            ep   = endPeriod.replace(
+                hour=endPeriod.hour - rem4, minute=0, second=0, microsecond=0
+            ).timestamp() - 1
+            df = df[df['unixtime'] <= ep].copy()
+            df = (
+                df.resample('4h', origin='epoch',offset='3h', closed='right', label='right')
+                .agg({'unixtime':'first','open':'first','high':'max','low':'min','close':'last'})
+                .dropna()
+            )
+            df = self._attach_dt_cols(df)
+
+        return df
+
+    def _finalize_interval(self, df, symbol, interval, indicatorList):
+        """Compute indicators, drop unused columns and keep the last 5 bars."""
+        # ---- compute indicators in-place (no copy) ----
+        # The streaming engine only advances its stored EMA state over bars
+        # that closed since the last poll; values match the batch ewm chain.
+        if _USE_INDICATOR_ENGINE:
+            engine = get_indicator_engine()
+            if "macd" in indicatorList:
+                df = engine.macd((symbol, interval), df)
+            if "rsi" in indicatorList:
+                df = engine.rsi((symbol, interval), df)
+        else:
+            if "macd" in indicatorList:
+                df = self._calculate_macd_inplace(df)
+            if "rsi" in indicatorList:
+                df = self._calculate_rsi_inplace(df)
+
+        # ---- drop every column we don't need ----
+        want = _FINAL_COLS_MACD if "macd" in indicatorList else _FINAL_COLS_RSI
+        keep = [c for c in want if c in df.columns]
+        df_sel = df[keep].tail(5).copy()
+        del df
+        gc.collect()
+
+        sym_clean        = symbol.replace("%3DF", "")
+        df_sel['interval'] = pd.Categorical([interval]  * len(df_sel))
+        df_sel['symbol']   = pd.Categorical([sym_clean] * len(df_sel))
+
+        return df_sel
+
+    def _resample_from_base(self, base, base_interval, interval):
+        """Build `interval` bars from a finer downloaded series.
+        Buckets are epoch-aligned and labelled by their start, matching the
+        bars Yahoo returns natively for that interval.
+        """
+        if interval == base_interval or base.empty:
+            return base
+        rule = f"{_INTERVAL_MINUTES[interval]}min"
+        df = (
+            base.resample(rule, origin='epoch')
+            .agg({'open':'first','high':'max','low':'min','close':'last'})
+            .dropna()
+        )
+        df['unixtime'] = (df.index - _EPOCH) // pd.Timedelta(seconds=1)
+        df = df[['unixtime', 'open', 'high', 'low', 'close']]
+        return self._attach_dt_cols(df)
+
+    @staticmethod
+    def _attach_dt_cols(df):
+        """Re-attach rec_dt/nmonth/nday/hour/minute from unixtime after a
+        resample.  Parts come from integer arithmetic on the epoch (see
+        timeParts); the zero-padded string categories are the same as the
+        old strftime('%m'/'%d'/'%H'/'%M') columns.
+        Downcasts unixtime to int32 afterwards to save memory.
+        """
+        parts = time_parts(df['unixtime'])
+        df['rec_dt'] = local_dates(parts.days)
+        df['nmonth'] = padded_category(parts.month)
+        df['nday']   = padded_category(parts.day)
+        df['hour']   = padded_category(parts.hour)
+        df['minute'] = padded_category(parts.minute)
         df['unixtime'] = df['unixtime'].astype('int32')
-        del dt_ny
+        del parts
         return df
 
     @staticmethod
@@ -8,6 +8,7 @@ import matplotlib.pyplot as plt
 from flask import Blueprint, request,render_template
 from dataManager import ServiceManager
 from alertManager import AlertManager
+from chartRenderer import chart_fingerprint, get_chart_cache
 
 # ---------------------------------------------------------------------------
 # Blueprint — register in main.py with: app.register_blueprint(day_trend_alert_bp)
@@ -176,17 +177,21 @@ def day_trend_alert():
     if df is None or df.empty:
         return f"No data available for {symbol}.", 404
 
-    buf = _build_image(symbol, df)
+    # Every interval's rows feed the table, so fingerprint all of them — and
+    # every column the table shows, not just the prices
+    chart_key = (symbol, 'multi', 'dayTrend', chart_fingerprint(
+        df, columns=['unixtime', 'interval', 'close', 'crossover', 'macd', 'msignal', 'histogram'],
+        rows=len(df)))
+    chart = get_chart_cache().get_or_render(chart_key, lambda: _build_image(symbol, df))
 
     del df
     gc.collect()
 
-    if buf is None:
+    if chart is None:
         return f"No Bullish/Bearish crossover signals found for {symbol} on 15m/30m.", 200
 
-    _altMgr.send_photo_alert(buf, filename=f"{symbol}_daytrend.png", set_title="Trend alert")
-    chart_image_base64 = base64.b64encode(buf.getvalue()).decode('utf-8')
-    buf.close()
+    _altMgr.send_photo_alert(chart.buffer(), filename=f"{symbol}_daytrend.png", set_title="Trend alert")
+    chart_image_base64 = chart.b64
 
     #return f"Day trend signal image for {symbol} sent to Telegram."
     return render_template('./sectorperformance.html', page_title="Trend alert", chart_image=chart_image_base64)
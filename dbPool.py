@@ -0,0 +1,167 @@
+"""
+dbPool.py
+=========
+Shared Postgres connection pool used by every AlertManager instance.
+
+  • One psycopg2 ThreadedConnectionPool per process, created lazily on the
+    first query, so `/csPattern` workers, `/returnPattern` and the
+    blueprints reuse warm connections instead of paying connection setup on
+    every DB call.
+  • Health check on checkout: closed connections are dropped, and a
+    connection idle longer than DB_POOL_CHECK_IDLE is pinged (`SELECT 1`)
+    and replaced if the server has gone away.
+  • `connection()` keeps the psycopg2 `with conn:` semantics the callers
+    relied on — commit on success, rollback on error — and hands the
+    connection back to the pool afterwards (discarding it if it broke).
+  • `session()` pins one connection to the current thread, so every
+    `connection()` block inside it (one request / one symbol) reuses it.
+
+Configuration (environment, all optional except DATABASE_URL):
+    DATABASE_URL          libpq connection string
+    DB_POOL_MINCONN       connections opened up front          (default 1)
+    DB_POOL_MAXCONN       upper bound on open connections      (default 10)
+    DB_POOL_CHECK_IDLE    ping connections idle longer than this many
+                          seconds before handing them out      (default 30)
+
+Usage:
+    from dbPool import get_db_pool
+    with get_db_pool().connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(...)
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import pool as pg_pool
+
+
+class DbPool:
+    def __init__(self, dsn=None, minconn=None, maxconn=None, check_idle=None):
+        self.dsn        = dsn or os.getenv("DATABASE_URL")
+        self.minconn    = minconn    if minconn    is not None else int(os.getenv("DB_POOL_MINCONN", 1))
+        self.maxconn    = maxconn    if maxconn    is not None else int(os.getenv("DB_POOL_MAXCONN", 10))
+        self.check_idle = check_idle if check_idle is not None else float(os.getenv("DB_POOL_CHECK_IDLE", 30))
+        self.maxconn    = max(self.maxconn, self.minconn, 1)
+
+        self._pool      = None
+        self._pool_lock = threading.Lock()
+        self._last_used = {}                # id(conn) -> time.monotonic() of last checkin
+        self._local     = threading.local()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def connection(self):
+        """Yield a healthy connection; commit on success, roll back on error."""
+        pinned = getattr(self._local, 'conn', None)
+        if pinned is not None:
+            with pinned:
+                yield pinned
+            return
+
+        conn = self._checkout()
+        broken = False
+        try:
+            with conn:
+                yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self._checkin(conn, broken or conn.closed)
+
+    @contextmanager
+    def session(self):
+        """Pin one pooled connection to this thread for the whole block.
+        Nested sessions reuse the outer one."""
+        if getattr(self._local, 'conn', None) is not None:
+            yield self._local.conn
+            return
+
+        conn = self._checkout()
+        self._local.conn = conn
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self._local.conn = None
+            self._checkin(conn, broken or conn.closed)
+
+    def close(self):
+        """Close every pooled connection (the pool re-opens lazily)."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+            self._last_used.clear()
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = pg_pool.ThreadedConnectionPool(self.minconn, self.maxconn, self.dsn)
+        return self._pool
+
+    def _checkout(self):
+        pool = self._get_pool()
+        # Every stale connection found is discarded, so this ends after at
+        # most maxconn + 1 attempts with a fresh connection (or PoolError).
+        for _ in range(self.maxconn + 1):
+            conn = pool.getconn()
+            if self._is_healthy(conn):
+                return conn
+            pool.putconn(conn, close=True)
+        raise pg_pool.PoolError("no healthy connection available")
+
+    def _checkin(self, conn, discard=False):
+        pool = self._pool
+        if pool is None:                    # close() ran while conn was out
+            conn.close()
+            return
+        if discard:
+            self._last_used.pop(id(conn), None)
+        else:
+            self._last_used[id(conn)] = time.monotonic()
+        pool.putconn(conn, close=discard)
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        last = self._last_used.get(id(conn))
+        if last is not None and time.monotonic() - last < self.check_idle:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            self._last_used.pop(id(conn), None)
+            return False
+
+
+_db_pool      = None
+_db_pool_lock = threading.Lock()
+
+
+def get_db_pool():
+    """Process-wide shared DbPool."""
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = DbPool()
+    return _db_pool
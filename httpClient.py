@@ -0,0 +1,191 @@
+"""
+httpClient.py
+=============
+Shared outbound HTTP layer used by every module that talks to Yahoo Finance
+or Telegram.
+
+  • One urllib3 connection pool per host, kept alive across requests, so the
+    5–20 sequential calls a route makes pay the TCP+TLS handshake once.
+  • Thread-safe: each worker thread gets its own requests.Session, and all of
+    them share a single pooled HTTPAdapter.
+  • Default timeout and retry/backoff applied to every call.
+
+Configuration (environment, all optional):
+    HTTP_POOL_CONNECTIONS  number of per-host pools to keep      (default 10)
+    HTTP_POOL_MAXSIZE      keep-alive connections per host        (default 10)
+    HTTP_TIMEOUT           default request timeout in seconds     (default 15)
+    HTTP_RETRIES           retries on connect errors / 429 / 5xx  (default 3)
+    HTTP_BACKOFF           exponential backoff factor in seconds  (default 0.5)
+
+Usage:
+    from httpClient import get_http_client
+    resp = get_http_client().get(url, params=params)
+
+RateLimiter spaces out request starts across threads (a fan-out of chart
+requests shares one limiter instead of sleeping a fixed time per call).
+
+AsyncHttpClient is the asyncio counterpart (aiohttp) with the same pool,
+timeout and retry settings; one instance belongs to one event loop.
+"""
+
+import asyncio
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import aiohttp
+except ImportError:       # only AsyncHttpClient needs it
+    aiohttp = None
+
+DEFAULT_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+RETRY_STATUSES  = (429, 500, 502, 503, 504)
+
+
+class HttpClient:
+    def __init__(self, pool_connections=None, pool_maxsize=None, timeout=None,
+                 retries=None, backoff=None):
+        self.pool_connections = pool_connections or int(os.getenv("HTTP_POOL_CONNECTIONS", 10))
+        self.pool_maxsize     = pool_maxsize     or int(os.getenv("HTTP_POOL_MAXSIZE", 10))
+        self.timeout          = timeout          or float(os.getenv("HTTP_TIMEOUT", 15))
+        retries               = retries if retries is not None else int(os.getenv("HTTP_RETRIES", 3))
+        backoff               = backoff if backoff is not None else float(os.getenv("HTTP_BACKOFF", 0.5))
+
+        # POST is left out of allowed_methods: a retried sendPhoto would post twice.
+        # raise_on_status=False hands the final response back so callers keep
+        # using raise_for_status() exactly as before.
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({'GET', 'HEAD'}),
+            raise_on_status=False,
+        )
+        self._adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+        self._local = threading.local()
+
+    def session(self):
+        """Return this thread's Session, creating it on first use."""
+        sess = getattr(self._local, 'session', None)
+        if sess is None:
+            sess = requests.Session()
+            sess.headers.update(DEFAULT_HEADERS)
+            sess.mount('https://', self._adapter)
+            sess.mount('http://',  self._adapter)
+            self._local.session = sess
+        return sess
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session().get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session().post(url, **kwargs)
+
+    def close(self):
+        """Drop every pooled connection (sessions re-open lazily)."""
+        self._adapter.close()
+
+
+_client      = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Process-wide shared HttpClient."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
+
+
+class RateLimiter:
+    """At most `rate` acquire() calls per second, shared by every thread
+    using this instance.  Each caller reserves the next free slot and sleeps
+    only until it arrives, so a burst of N calls spreads over N / rate
+    seconds instead of N fixed sleeps."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next    = 0.0
+        self._lock    = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now  = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class AsyncHttpClient:
+    """aiohttp-based client: one pooled keep-alive connector per instance,
+    HTTP_POOL_MAXSIZE connections per host, retry with exponential backoff
+    on connect errors / 429 / 5xx for GET.  Create and use it inside a
+    running event loop; `async with AsyncHttpClient() as client:` closes
+    the connector on exit.
+    """
+
+    def __init__(self, pool_maxsize=None, timeout=None, retries=None, backoff=None):
+        if aiohttp is None:
+            raise ImportError("AsyncHttpClient requires aiohttp (pip install aiohttp)")
+        self.pool_maxsize = pool_maxsize or int(os.getenv("HTTP_POOL_MAXSIZE", 10))
+        self.timeout      = timeout      or float(os.getenv("HTTP_TIMEOUT", 15))
+        self.retries      = retries if retries is not None else int(os.getenv("HTTP_RETRIES", 3))
+        self.backoff      = backoff if backoff is not None else float(os.getenv("HTTP_BACKOFF", 0.5))
+        self._session     = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.pool_maxsize)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=DEFAULT_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def get_json(self, url, params=None):
+        """GET url and return the decoded JSON body; raises
+        aiohttp.ClientResponseError on a non-2xx final response."""
+        attempt = 0
+        while True:
+            try:
+                async with self.session().get(url, params=params) as resp:
+                    if resp.status in RETRY_STATUSES and attempt < self.retries:
+                        raise aiohttp.ClientResponseError(
+                            resp.request_info, resp.history, status=resp.status)
+                    resp.raise_for_status()
+                    return await resp.json(content_type=None)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError,
+                    aiohttp.ClientResponseError) as e:
+                retryable = not isinstance(e, aiohttp.ClientResponseError) or e.status in RETRY_STATUSES
+                if not retryable or attempt >= self.retries:
+                    raise
+                await asyncio.sleep(self.backoff * (2 ** attempt))
+                attempt += 1
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
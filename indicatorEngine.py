@@ -0,0 +1,290 @@
+"""
+indicatorEngine.py
+==================
+Streaming MACD / RSI with persisted EMA state.
+
+ServiceManager used to recompute the whole ewm chain over four days of bars
+on every poll although only the newest bar's value moves.  IndicatorEngine
+keeps, per (symbol, interval), the EMA / signal / Wilder-average state as of
+the last *closed* bar:
+
+  • A poll advances the state over the bars that closed since the last
+    call (usually one) and evaluates the live last bar from that state
+    without committing it — O(1) per poll instead of O(bars).
+  • Each step repeats pandas' ewm recursion operation for operation, so the
+    values are identical to `ewm(..., adjust=False)` (and the adjusted RSI
+    signal) run over the same bars.
+  • The state is rebuilt from the frame when the frame starts at a
+    different bar than the one the state was seeded from (the rolling
+    download window slid — batch ewm restarts there, and 1h/4h windows are
+    too short for the difference to decay), when its last committed bar is
+    no longer in the frame, or when that bar's close changed.
+  • Only the last `keep` rows (5, what _finalize_interval keeps) get values;
+    earlier rows are NaN / "Neutral".
+
+Configuration (environment, all optional):
+    INDICATOR_ENGINE          0 disables the engine (batch ewm)   (default 1)
+    INDICATOR_ENGINE_MAXSIZE  (symbol, interval, indicator) states kept,
+                              least recently used dropped first   (default 1024)
+
+Usage:
+    from indicatorEngine import get_indicator_engine
+    df = get_indicator_engine().macd((symbol, interval), df)
+    df = get_indicator_engine().rsi((symbol, interval), df)
+"""
+
+import os
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+_NAN = float('nan')
+
+
+def _ewm_params(span=None, alpha=None, adjust=False):
+    """(old_wt_factor, new_wt, adjust) exactly as pandas derives them."""
+    com   = (span - 1) / 2 if span is not None else (1 - alpha) / alpha
+    alpha = 1. / (1. + float(com))
+    return 1. - alpha, (1. if adjust else alpha), adjust
+
+
+def _ewm_step(state, cur, params):
+    """One observation of pandas' ewm recursion (ignore_na=False).
+    state is (weighted, old_wt); returns the new state."""
+    weighted, old_wt = state
+    factor, new_wt, adjust = params
+    if weighted == weighted:
+        old_wt *= factor
+        if cur == cur:
+            if weighted != cur:
+                weighted = old_wt * weighted + new_wt * cur
+                weighted /= (old_wt + new_wt)
+            old_wt = old_wt + new_wt if adjust else 1.
+    elif cur == cur:
+        weighted = cur
+    return weighted, old_wt
+
+
+def _round2(x):
+    """Series.round(2).astype('float32') for one value."""
+    return np.float32(np.round(x, 2))
+
+
+class _Series:
+    """Committed state of one indicator series seeded from the frame
+    starting at bar `first`."""
+    __slots__ = ('first', 'ts', 'close', 'state', 'history')
+
+    def __init__(self, first, ts, close, state, history):
+        self.first   = first
+        self.ts      = ts
+        self.close   = close
+        self.state   = state
+        self.history = history
+
+
+class IndicatorEngine:
+    def __init__(self, maxsize=None, keep=5):
+        self.maxsize = maxsize or int(os.getenv("INDICATOR_ENGINE_MAXSIZE", 1024))
+        self.keep    = keep
+        self._series = OrderedDict()
+        self._lock   = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def macd(self, key, df, fast=12, slow=26, signal=9):
+        """macd / msignal / histogram columns in-place (float32), as
+        ServiceManager._calculate_macd_inplace computes them."""
+        p_fast, p_slow = _ewm_params(span=fast), _ewm_params(span=slow)
+        p_sig = _ewm_params(span=signal)
+
+        def step(state, close):
+            ema_fast, ema_slow, sig = state
+            ema_fast = _ewm_step(ema_fast, close, p_fast)
+            ema_slow = _ewm_step(ema_slow, close, p_slow)
+            macd_line = ema_fast[0] - ema_slow[0]
+            sig = _ewm_step(sig, macd_line, p_sig)
+            out = (_round2(macd_line), _round2(sig[0]), _round2(macd_line - sig[0]))
+            return (ema_fast, ema_slow, sig), out
+
+        def seed(closes):
+            close     = pd.Series(closes)
+            ema_fast  = close.ewm(span=fast,   adjust=False).mean()
+            ema_slow  = close.ewm(span=slow,   adjust=False).mean()
+            macd_line = ema_fast - ema_slow
+            sig_line  = macd_line.ewm(span=signal, adjust=False).mean()
+            state = ((ema_fast.iloc[-1], 1.), (ema_slow.iloc[-1], 1.), (sig_line.iloc[-1], 1.))
+            tail  = slice(-self.keep, None)
+            outs  = zip(macd_line.round(2).astype('float32').to_numpy()[tail],
+                        sig_line.round(2).astype('float32').to_numpy()[tail],
+                        (macd_line - sig_line).round(2).astype('float32').to_numpy()[tail])
+            return state, list(outs)
+
+        rows = self._advance(key + ('macd', fast, slow, signal), df, step, seed)
+        for col, values in zip(('macd', 'msignal', 'histogram'), self._columns(df, rows, (np.nan,) * 3)):
+            df[col] = values
+        return df
+
+    def rsi(self, key, df, period=14):
+        """rsi / rsignal / crossover columns in-place, as
+        ServiceManager._calculate_rsi_inplace computes them."""
+        p_avg = _ewm_params(alpha=1.0 / period)
+        p_sig = _ewm_params(span=period, adjust=True)
+
+        def step(state, close):
+            prev_close, avg_gain, avg_loss, rsig, prev = state
+            diff = close - prev_close
+            avg_gain = _ewm_step(avg_gain, max(diff, 0.), p_avg)
+            avg_loss = _ewm_step(avg_loss, max(-diff, 0.), p_avg)
+
+            gain, loss = avg_gain[0], avg_loss[0]
+            if loss == 0:
+                rs = _NAN if gain == 0 or gain != gain else float('inf')
+            else:
+                rs = gain / loss
+            rsi  = _round2(100 - (100 / (1 + rs)))
+            rsig = _ewm_step(rsig, float(rsi), p_sig)
+            rsignal = _round2(rsig[0])
+
+            if rsi > rsignal and prev[0] < prev[1]:
+                crossover = "Bullish"
+            elif rsi < rsignal and prev[0] > prev[1]:
+                crossover = "Bearish"
+            else:
+                crossover = "Neutral"
+            return (close, avg_gain, avg_loss, rsig, (rsi, rsignal)), (rsi, rsignal, crossover)
+
+        def seed(closes):
+            diff     = pd.Series(closes).diff()
+            avg_gain = diff.clip(lower=0).ewm(alpha=1.0 / period, adjust=False).mean()
+            avg_loss = (-diff).clip(lower=0).ewm(alpha=1.0 / period, adjust=False).mean()
+            rsi      = (100 - (100 / (1 + avg_gain / avg_loss))).round(2).astype('float32')
+            rsig     = rsi.astype('float64').ewm(span=period).mean()
+            rsignal  = rsig.round(2).astype('float32')
+
+            # The adjusted signal's weight sum depends on how many rows
+            # (observed or NaN) followed its first observation
+            old_wt, factor = 1., p_sig[0]
+            values = rsi.to_numpy()
+            first  = np.flatnonzero(~np.isnan(values))
+            for v in values[first[0] + 1:] if len(first) else ():
+                old_wt *= factor
+                if v == v:
+                    old_wt += 1.
+
+            prev_rsi, prev_sig = rsi.shift(1), rsignal.shift(1)
+            crossover = np.where((rsi > rsignal) & (prev_rsi < prev_sig), "Bullish",
+                                 np.where((rsi < rsignal) & (prev_rsi > prev_sig), "Bearish", "Neutral"))
+            state = (float(closes[-1]), (avg_gain.iloc[-1], 1.), (avg_loss.iloc[-1], 1.),
+                     (rsig.iloc[-1], old_wt), (rsi.iloc[-1], rsignal.iloc[-1]))
+            tail  = slice(-self.keep, None)
+            return state, list(zip(rsi.to_numpy()[tail], rsignal.to_numpy()[tail], crossover[tail]))
+
+        rows = self._advance(key + ('rsi', period), df, step, seed)
+        rsi, rsignal, crossover = self._columns(df, rows, (np.nan, np.nan, "Neutral"))
+        df['rsi']       = rsi
+        df['rsignal']   = rsignal
+        df['crossover'] = crossover
+        return df
+
+    def invalidate(self, key=None):
+        """Forget the state of one (symbol, interval) key, or of everything."""
+        with self._lock:
+            if key is None:
+                self._series.clear()
+            else:
+                for k in [k for k in self._series if k[:len(key)] == key]:
+                    del self._series[k]
+
+    # ------------------------------------------------------------------
+    # Private helpers
+    # ------------------------------------------------------------------
+
+    def _advance(self, key, df, step, seed):
+        """Commit every closed bar after the stored state, evaluate the live
+        last bar, and return [(unixtime, outputs), ...] for the last rows.
+
+        step(state, close) -> (state, outputs) advances one bar;
+        seed(closes) -> (state, [outputs, ...]) builds the state after
+        `closes` with the vectorised ewm chain (fresh or rebuilt series).
+        """
+        ts     = df['unixtime'].to_numpy()
+        values = df['close'].to_numpy(dtype='float64')
+        closes = values.tolist()
+        n      = len(ts)
+        if n == 0:
+            return []
+
+        with self._lock:
+            entry = self._series.get(key)
+        first = int(ts[0])
+        begin = None
+        if entry is not None and entry.first == first:
+            i = int(np.searchsorted(ts, entry.ts))
+            if i < n and ts[i] == entry.ts and closes[i] == entry.close:
+                begin, state, history = i + 1, entry.state, deque(entry.history, maxlen=self.keep)
+        if begin is None:
+            entry = None
+            if n > 1:
+                state, outs = seed(values[:n - 1])
+                history = deque(zip(ts[:n - 1][-len(outs):].tolist(), outs), maxlen=self.keep)
+                begin = n - 1
+            else:
+                begin, state, history = 0, None, deque(maxlen=self.keep)
+
+        for j in range(begin, n - 1):
+            state, out = step(state, closes[j])
+            history.append((int(ts[j]), out))
+
+        rows = list(history)
+        if begin < n:
+            if state is None:                       # a single bar: nothing to commit yet
+                live = seed(values)[1][-1]
+            else:
+                _, live = step(state, closes[n - 1])
+            rows.append((int(ts[n - 1]), live))
+            if n > 1 and (begin < n - 1 or entry is None):
+                self._store(key, _Series(first, int(ts[n - 2]), closes[n - 2], state, history))
+        return rows[-self.keep:]
+
+    def _store(self, key, series):
+        with self._lock:
+            if series is None:
+                self._series.pop(key, None)
+                return
+            self._series[key] = series
+            self._series.move_to_end(key)
+            while len(self._series) > self.maxsize:
+                self._series.popitem(last=False)
+
+    @staticmethod
+    def _columns(df, rows, defaults):
+        """Scatter row outputs onto full-length arrays; rows without one get
+        the column's default (NaN -> float32 column, str -> object column)."""
+        ts   = df['unixtime'].to_numpy()
+        cols = [np.full(len(ts), d, dtype='float32' if isinstance(d, float) else object)
+                for d in defaults]
+        for t, out in rows:
+            pos = int(np.searchsorted(ts, t))
+            if pos < len(ts) and ts[pos] == t:
+                for col, value in zip(cols, out):
+                    col[pos] = value
+        return cols
+
+
+_engine      = None
+_engine_lock = threading.Lock()
+
+
+def get_indicator_engine():
+    """Process-wide shared IndicatorEngine."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = IndicatorEngine()
+    return _engine
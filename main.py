@@ -1,12 +1,17 @@
 import os
 import base64
 import gc
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta, timezone
 import numpy as np
 import pandas as pd
 from flask import Flask, render_template, request
 from dataManager import ServiceManager
+from asyncDataManager import AsyncServiceManager
 from alertManager import AlertManager
+from chartRenderer import chart_fingerprint, get_chart_cache
 from supresrange import SupportResistanceByInputInterval
 from csPattern import csPattern
 from sectorperformance import SectorPerformance
@@ -27,13 +32,153 @@ altMgr = AlertManager()
 # Helpers
 # ---------------------------------------------------------------------------
 
-def process_stocksignal(symbol="SPY"):
-    """Fetch + analyse one symbol; return a minimal DataFrame slice."""
-    global g_message
-    df = objMgr.analyze_stockdata(symbol)
-    altMgr.prepare_crsovr_message(df)
-    g_message = altMgr.get_message()
-    return df
+def process_cspattern_symbol(symbol, cancelled=None):
+    """Run the open/close order logic for one symbol and return the alert
+    lines it produced (possibly empty).  Safe to call from worker threads:
+    every symbol gets its own csPattern / ServiceManager, and all of its DB
+    calls share one pooled connection.
+
+    cancelled: optional threading.Event; once set (the symbol timed out)
+    nothing more is written to stockorder and None is returned."""
+    with altMgr.db_session():
+        return _process_cspattern_symbol(symbol, cancelled)
+
+
+def _process_cspattern_symbol(symbol, cancelled=None):
+    def stopped():
+        return cancelled is not None and cancelled.is_set()
+
+    messages = []
+
+    # Load any existing open order from DB before constructing csPattern
+    dbrecval = altMgr.GetStockOrderRecordfromDB(symbol, 'Open')
+
+    cs = csPattern()
+    if dbrecval is not None:
+        cs.openorderon5m = dbrecval
+
+    # analyze_stockcandlesLTF already frees its DataFrames internally
+    cs.analyze_stockcandlesLTF(symbol)
+
+    open_order  = cs.openorderon5m
+    close_order = cs.closeorderon5m
+
+    # ---- open signal ----
+    if open_order is not None and close_order is None:
+        existing = altMgr.GetStockOrderRecordusingUnixTime(
+            symbol,
+            str(open_order['unixtime']),
+            str(open_order['hour']),
+            str(open_order['minute'])
+        )
+        if existing is None:
+            if stopped():
+                return None
+            altMgr.AddOpenStockOrderRecordtoDB(open_order)
+            # Only alert on genuinely new candles (first detection)
+            if open_order['updatedTriggerTime'] == open_order['unixtime']:
+                messages.append(
+                    f"Symbol: {open_order['symbol']} "
+                    f"Time: {open_order['hour']}:{open_order['minute']} "
+                    f"Pattern: {open_order['cspattern']}, "
+                    f"open price: {open_order['stockprice']}, "
+                    f"stoploss: {open_order['stoploss']}, "
+                    f"profittarget: {open_order['profittarget']}"
+                )
+
+    # ---- close signal ----
+    if close_order is not None:
+        if stopped():
+            return None
+        if open_order is not None:
+            altMgr.AddOpenStockOrderRecordtoDB(open_order, "OpenClose")
+        messages.append(
+            f"Symbol: {close_order['symbol']} "
+            f"Time: {close_order['hour']}:{close_order['minute']} "
+            f"Pattern: {close_order['cspattern']}, "
+            f"close price: {close_order['stockprice']}"
+        )
+        cs.openorderon5m  = None
+        cs.closeorderon5m = None
+
+    # Free everything for this symbol immediately
+    del cs, open_order, close_order, dbrecval
+    return messages
+
+
+def run_symbols_bounded(func, symbols, max_workers=None, symbol_timeout=None):
+    """Run func(symbol, cancelled) for every symbol on a bounded thread pool
+    and return the results in the same order as `symbols`.
+
+    max_workers     CSPATTERN_WORKERS env, default 4 (1 = serial)
+    symbol_timeout  CSPATTERN_SYMBOL_TIMEOUT env, default 25 s of wall time
+                    per symbol, counted from when a worker picks it up.  A
+                    symbol still queued after timeout * ceil(n / workers)
+                    (all workers stuck) is dropped without running.
+
+    `cancelled` is a threading.Event set when the symbol times out.  Worker
+    threads cannot be killed, so func must check it before any side effect
+    (DB writes, alerts) — a straggler then finishes without touching state
+    for a run that already reported it as timed out.
+
+    A symbol that raises or does not finish in time yields None and is
+    logged; it never takes the other symbols down with it.
+    """
+    max_workers    = max_workers    or int(os.getenv("CSPATTERN_WORKERS", 4))
+    symbol_timeout = symbol_timeout or float(os.getenv("CSPATTERN_SYMBOL_TIMEOUT", 25))
+    max_workers    = max(1, min(max_workers, len(symbols)))
+
+    if max_workers == 1:
+        results = []
+        for symbol in symbols:
+            try:
+                results.append(func(symbol, threading.Event()))
+            except Exception as e:
+                print(f"  {symbol}: {e}")
+                results.append(None)
+        return results
+
+    cancelled = [threading.Event() for _ in symbols]
+    started   = [None] * len(symbols)
+
+    def run(i):
+        started[i] = time.monotonic()
+        return func(symbols[i], cancelled[i])
+
+    waves          = -(-len(symbols) // max_workers)
+    queue_deadline = time.monotonic() + symbol_timeout * waves
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="symbol")
+    futures  = [executor.submit(run, i) for i in range(len(symbols))]
+
+    results = [None] * len(symbols)
+    pending = set(range(len(symbols)))
+    while pending:
+        now = time.monotonic()
+        for i in sorted(pending):
+            symbol, fut = symbols[i], futures[i]
+            if fut.done():
+                pending.discard(i)
+                if fut.exception() is not None:
+                    print(f"  {symbol}: {fut.exception()}")
+                else:
+                    results[i] = fut.result()
+            elif started[i] is not None and now - started[i] >= symbol_timeout:
+                cancelled[i].set()
+                pending.discard(i)
+                print(f"  {symbol}: timed out after {symbol_timeout:g}s")
+            elif started[i] is None and now >= queue_deadline:
+                cancelled[i].set()
+                fut.cancel()
+                pending.discard(i)
+                print(f"  {symbol}: not started within {symbol_timeout * waves:g}s")
+        if pending:
+            # Wake on a completion, or shortly to check start times/deadlines
+            wait([futures[i] for i in pending], timeout=0.25, return_when=FIRST_COMPLETED)
+
+    # Don't block the request on stragglers; they see their cancel event
+    # before writing anything
+    executor.shutdown(wait=False, cancel_futures=True)
+    return results
 
 
 # ---------------------------------------------------------------------------
@@ -50,57 +195,11 @@ def CandleStickPattern():
         env_sym = os.getenv("CUSTOM_ALERT_SYMBOL", "")
         stocksymbols = [s.strip() for s in env_sym.split(",") if s.strip()] or ['SPY']
 
+    # Symbols are analysed concurrently; messages are joined in symbol order
     allsymbols_data = []
-    for symbol in stocksymbols:
-        # Load any existing open order from DB before constructing csPattern
-        dbrecval = altMgr.GetStockOrderRecordfromDB(symbol, 'Open')
-
-        cs = csPattern()
-        if dbrecval is not None:
-            cs.openorderon5m = dbrecval
-
-        # analyze_stockcandlesLTF already frees its DataFrames internally
-        cs.analyze_stockcandlesLTF(symbol)
-
-        open_order  = cs.openorderon5m
-        close_order = cs.closeorderon5m
-
-        # ---- open signal ----
-        if open_order is not None and close_order is None:
-            existing = altMgr.GetStockOrderRecordusingUnixTime(
-                symbol,
-                str(open_order['unixtime']),
-                str(open_order['hour']),
-                str(open_order['minute'])
-            )
-            if existing is None:
-                altMgr.AddOpenStockOrderRecordtoDB(open_order)
-                # Only alert on genuinely new candles (first detection)
-                if open_order['updatedTriggerTime'] == open_order['unixtime']:
-                    allsymbols_data.append(
-                        f"Symbol: {open_order['symbol']} "
-                        f"Time: {open_order['hour']}:{open_order['minute']} "
-                        f"Pattern: {open_order['cspattern']}, "
-                        f"open price: {open_order['stockprice']}, "
-                        f"stoploss: {open_order['stoploss']}, "
-                        f"profittarget: {open_order['profittarget']}"
-                    )
-
-        # ---- close signal ----
-        if close_order is not None:
-            if open_order is not None:
-                altMgr.AddOpenStockOrderRecordtoDB(open_order, "OpenClose")
-            allsymbols_data.append(
-                f"Symbol: {close_order['symbol']} "
-                f"Time: {close_order['hour']}:{close_order['minute']} "
-                f"Pattern: {close_order['cspattern']}, "
-                f"close price: {close_order['stockprice']}"
-            )
-            cs.openorderon5m  = None
-            cs.closeorderon5m = None
-
-        # Free everything for this symbol immediately
-        del cs, open_order, close_order, dbrecval
+    for messages in run_symbols_bounded(process_cspattern_symbol, stocksymbols):
+        if messages:
+            allsymbols_data.extend(messages)
 
     resultdata = ",".join(allsymbols_data)
     if allsymbols_data:
@@ -149,11 +248,13 @@ def ScalpPattern():
         gc.collect()
         return "<h1>Error: Could not generate analysis.</h1>", 500
 
-    image_buffer       = scalper.plot_15min_chart(bars_to_show=96)
-    chart_image_base64 = base64.b64encode(image_buffer.getvalue()).decode('utf-8')
-    image_buffer.close()
+    # Same bars as the last render -> reuse the cached PNG, skip matplotlib
+    chart_key = (symbol, interval, 'scalp', chart_fingerprint(scalper.data, extra=(96,)))
+    chart = get_chart_cache().get_or_render(chart_key, lambda: scalper.plot_15min_chart(bars_to_show=96))
+    # Nothing drawn -> render the summary without a chart
+    chart_image_base64 = chart.b64 if chart is not None else None
 
-    del scalper, image_buffer
+    del scalper, chart
     gc.collect()
 
     return render_template('./scalp.html', summary=summary, chart_image=chart_image_base64)
@@ -163,12 +264,14 @@ def ScalpPattern():
 def SectorPerformanceGet():
     sectorperf = SectorPerformance()
     df = sectorperf.fetch_sector_data()
-    image_buffer = sectorperf.plot_sector_chart(df, out_path="sector_performance.png")
-    altMgr.send_photo_alert(image_buffer)
-    chart_image_base64 = base64.b64encode(image_buffer.getvalue()).decode('utf-8')
-    image_buffer.close()
-
-    del sectorperf, image_buffer, df
+    chart_key = ('SECTORS', '1m', 'sector', chart_fingerprint(
+        df, columns=['symbol', 'prev_close', 'curr_price', 'change_pct'], rows=len(df)))
+    chart = get_chart_cache().get_or_render(
+        chart_key, lambda: sectorperf.plot_sector_chart(df, out_path="sector_performance.png"))
+    altMgr.send_photo_alert(chart.buffer())
+    chart_image_base64 = chart.b64
+
+    del sectorperf, chart, df
     gc.collect()
 
     return render_template('./sectorperformance.html', page_title="Sector Performance", chart_image=chart_image_base64)
@@ -264,22 +367,22 @@ def ReturnPattern():
     symbol       = request.args.get('symbol', default='', type=str).upper()
     stocksymbols = [symbol] if symbol else ['GLD', 'QQQ', 'IWM']
 
-    # Process each symbol, stream-concat into a single result; never hold
-    # more than one symbol's DataFrame in memory at once
-    frames = []
-    for ss in stocksymbols:
-        df_stock = process_stocksignal(ss)
-        frames.append(df_stock)
-        del df_stock
-        gc.collect()
+    # Download every symbol concurrently on one event loop, then dedup and
+    # record the crossover alerts for all symbols in one DB round-trip
+    analysed = AsyncServiceManager.run_analyze_symbols(stocksymbols)
+    frames = [df for df in (analysed.pop(ss) for ss in stocksymbols) if df is not None]
+    altMgr.prepare_crsovr_messages(frames)
+    g_message = altMgr.get_message()
+    del analysed
+    gc.collect()
 
     df_allsymbols = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
     del frames
     gc.collect()
 
     if g_message:
-        sentmsg = altMgr.send_chart_alert(g_message)
-        print(sentmsg)
+        if not altMgr.send_chart_alert(g_message):
+            print("[Telegram] alert dispatcher closed, crossover alert not queued")
 
     result = df_allsymbols.to_json(orient='records', index=False)
     del df_allsymbols
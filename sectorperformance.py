@@ -7,26 +7,84 @@ sector_performance.py
 3. Renders a compact single-side bar chart (all bars extend right from zero).
    Green = gain, Red = loss.
 
+Configuration (environment, all optional):
+    SECTOR_FETCH_WORKERS  concurrent chart requests            (default 6)
+    SECTOR_FETCH_RATE     chart requests started per second    (default 25)
+    SECTOR_FETCH_MODE     "quote" (previous close + 1m tail) or
+                          "history" (days of 1m bars)          (default quote)
+    SECTOR_QUOTE_TAIL     minutes of 1m bars fetched for the
+                          latest print in quote mode            (default 15)
+
 Run:
     python sector_performance.py
 """
 
+import os
+import threading
 import time
-import requests
 import numpy  as np
 import pandas as pd
-import yfinance as yf
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
 import warnings
 import io
 import base64
 import gc
+from concurrent.futures import ThreadPoolExecutor
+from chartRenderer import draw_colored_title
+from dataManager import ServiceManager
+from httpClient import RateLimiter
 warnings.filterwarnings('ignore')
 
+_ET = ZoneInfo("America/New_York")
+
+# symbol -> (as-of session date, prev_close, unix time of that session's 16:00 close)
+_prev_close_cache = {}
+_prev_close_lock  = threading.Lock()
+
+
+def _last_completed_session(now):
+    """Date of the most recent weekday whose 16:00 ET close is at or before
+    unix time `now` (holidays are resolved by the daily bars themselves)."""
+    now_et = datetime.fromtimestamp(now, _ET)
+    day = now_et.date()
+    if now_et.hour < 16:
+        day -= timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+def _previous_close(svc, symbol, now):
+    """(close, close unix time) of the last completed regular session.
+    Fetched once per trading day from ~10 daily bars, then served from
+    _prev_close_cache — it cannot change until the next 16:00 close."""
+    as_of = _last_completed_session(now)
+    with _prev_close_lock:
+        cached = _prev_close_cache.get(symbol)
+    if cached is not None and cached[0] == as_of:
+        return cached[1:]
+
+    daily = svc.download_stock_data(symbol, now - 10 * 86400, now, "1d")
+    if daily is None or daily.empty:
+        return None
+    # Today's daily bar is still live until 16:00; keep completed sessions only
+    daily = daily[daily['rec_dt'] <= as_of]
+    if daily.empty:
+        return None
+    session = daily['rec_dt'].iloc[-1]
+    close   = round(float(daily['close'].iloc[-1]), 2)
+    closed_at = int(datetime(session.year, session.month, session.day, 16, tzinfo=_ET).timestamp())
+
+    with _prev_close_lock:
+        _prev_close_cache[symbol] = (as_of, close, closed_at)
+    return close, closed_at
+
+
 # ── S&P 500 Select Sector SPDR ETFs ──────────────────────────────────────────
 
 class SectorPerformance:
@@ -58,70 +116,65 @@ class SectorPerformance:
 
 # ── 1. Data retrieval ─────────────────────────────────────────────────────────
 
-    def fetch_sector_data(self) -> pd.DataFrame:
+    def fetch_sector_data(self, mode=None) -> pd.DataFrame:
         """
-        Downloads intraday data to accurately parse out the most recent 
-        completed 16:00 EST closing price as a baseline, comparing it against
-        the absolute latest market print (Pre-market, Regular, or Post-market).
+        Compares the most recent completed regular-session close (the
+        baseline) against the absolute latest market print (Pre-market,
+        Regular, or Post-market).
+
+        mode (SECTOR_FETCH_MODE env, default "quote"):
+            "quote"    previous close from a handful of daily bars, cached for
+                       the trading day, plus a short 1m tail for the latest
+                       print — a few dozen rows per ETF instead of days of
+                       1-minute history.
+            "history"  up to 4 days of 1m bars per ETF through the rolling
+                       BarStore; the baseline is the last 09:29–15:59 bar
+                       before the latest print.
+
+        The 11 ETFs are fetched concurrently (SECTOR_FETCH_WORKERS threads)
+        through the shared Yahoo chart client, with request starts spaced by
+        one RateLimiter (SECTOR_FETCH_RATE per second).
 
         Returns DataFrame with columns:
             symbol | sector | prev_close | curr_price | change | change_pct
         sorted descending by change_pct.
         """
-        records = []
-        current_weekday = datetime.now().weekday()
-        
-        if current_weekday == 0:     # Monday
-            history_period = "4d"    # Covers Mon, Sun, Sat, Fri
-        elif current_weekday in [5, 6]: # Weekend tracking
-            history_period = "3d"    # Covers Weekend + Friday
-        else:                        # Tuesday through Friday
-            history_period = "2d"    # Covers Today + Yesterday
-
-        for symbol, sector in self.SECTORS.items():
+        mode = mode or os.getenv("SECTOR_FETCH_MODE", "quote")
+        svc  = ServiceManager()
+
+        if mode == "history":
+            current_weekday = datetime.now().weekday()
+
+            if current_weekday == 0:     # Monday
+                history_days = 4         # Covers Mon, Sun, Sat, Fri
+            elif current_weekday in [5, 6]: # Weekend tracking
+                history_days = 3         # Covers Weekend + Friday
+            else:                        # Tuesday through Friday
+                history_days = 2         # Covers Today + Yesterday
+
+            endPeriod   = int(datetime.now().timestamp())
+            startPeriod = int((datetime.now() - timedelta(days=history_days)).timestamp())
+
+            def record(symbol, sector):
+                return self._sector_record(svc, symbol, sector, startPeriod, endPeriod)
+        else:
+            def record(symbol, sector):
+                return self._sector_quote(svc, symbol, sector)
+
+        workers = max(1, min(int(os.getenv("SECTOR_FETCH_WORKERS", 6)), len(self.SECTORS)))
+        limiter = RateLimiter(float(os.getenv("SECTOR_FETCH_RATE", 25)))
+
+        def fetch(item):
+            symbol, sector = item
+            limiter.acquire()
             try:
-                ticker = yf.Ticker(symbol)
-                # Fetch 5 days of 1-minute bars with extended market sessions included
-                data = ticker.history(period=history_period, interval="1m", prepost=True)
-
-                if data.empty or len(data) <= 1:
-                    print(f"  {symbol}: not enough data")
-                    continue
-
-                # 1. Grab the absolute latest available price row (Pre, Reg, or Post)
-                curr_row = data.iloc[-1]
-                curr = round(float(curr_row['Close']), 2)
-                latest_timestamp = data.index[-1]
-
-                # 2. Filter for standard regular session hours (09:30 to 16:00 EST/EDT)
-                # Note: yfinance localized timestamps reflect the exchange's timezone natively.
-                reg_hours_data = data.between_time("09:29", "15:59")
-                
-                # Filter out regular hour sessions that match or come after the current tick time
-                # (This ensures that during Next Day Pre-Market, it looks back at Yesterday's Regular Close)
-                past_reg_data = reg_hours_data[reg_hours_data.index < latest_timestamp]
-
-                if not past_reg_data.empty:
-                    # The final tick of the last completed standard session is the official baseline
-                    prev = round(float(past_reg_data['Close'].iloc[-1]), 2)
-                else:
-                    # Emergency fallback to first available price if historical regular data missing
-                    prev = round(float(data['Close'].iloc[0]), 2)
-
-                chg  = round(curr - prev, 2)
-                pct  = round((chg / prev) * 100, 2)
-
-                records.append({'symbol': symbol, 'sector': sector,
-                                'prev_close': prev, 'curr_price': curr,
-                                'change': chg, 'change_pct': pct})
-                del data
-
-            except requests.exceptions.HTTPError as e:
-                print(f"  {symbol}: HTTP error – {e}")
+                return record(symbol, sector)
             except Exception as e:
                 print(f"  {symbol}: {e}")
+                return None
 
-            time.sleep(0.25)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sector") as executor:
+            records = [rec for rec in executor.map(fetch, self.SECTORS.items()) if rec is not None]
 
         if not records:
             raise RuntimeError(
@@ -139,6 +192,72 @@ class SectorPerformance:
 
         return df_all
 
+    @staticmethod
+    def _sector_record(svc, symbol, sector, startPeriod, endPeriod):
+        """prev_close / curr_price / change record for one ETF, or None."""
+        # 1-minute bars with extended market sessions included
+        data = svc.download_stock_data_incremental(symbol, startPeriod, endPeriod, interval="1m")
+
+        if data is None or len(data) <= 1:
+            print(f"  {symbol}: not enough data")
+            return None
+
+        # 1. Grab the absolute latest available price row (Pre, Reg, or Post)
+        close = data['close']
+        curr = round(float(close.iloc[-1]), 2)
+        latest_timestamp = data.index[-1]
+
+        # 2. Filter for standard regular session hours (09:30 to 16:00 EST/EDT)
+        # Note: the chart frame's index is already in America/New_York.
+        reg_hours_close = close.between_time("09:29", "15:59")
+        
+        # Filter out regular hour sessions that match or come after the current tick time
+        # (This ensures that during Next Day Pre-Market, it looks back at Yesterday's Regular Close)
+        past_reg_close = reg_hours_close[reg_hours_close.index < latest_timestamp]
+
+        if not past_reg_close.empty:
+            # The final tick of the last completed standard session is the official baseline
+            prev = round(float(past_reg_close.iloc[-1]), 2)
+        else:
+            # Emergency fallback to first available price if historical regular data missing
+            prev = round(float(close.iloc[0]), 2)
+
+        chg  = round(curr - prev, 2)
+        pct  = round((chg / prev) * 100, 2)
+
+        return {'symbol': symbol, 'sector': sector,
+                'prev_close': prev, 'curr_price': curr,
+                'change': chg, 'change_pct': pct}
+
+    @staticmethod
+    def _sector_quote(svc, symbol, sector):
+        """Quote-mode record for one ETF: cached previous close plus the
+        latest 1m print, or None."""
+        now      = int(time.time())
+        baseline = _previous_close(svc, symbol, now)
+        if baseline is None:
+            print(f"  {symbol}: no previous close")
+            return None
+        prev, session_end = baseline
+
+        # Latest print: a short 1m tail, widened back to the baseline
+        # session's close when nothing traded recently (overnight, weekend)
+        tail_start = now - int(os.getenv("SECTOR_QUOTE_TAIL", 15)) * 60
+        data = svc.download_stock_data(symbol, tail_start, now, "1m")
+        if (data is None or data.empty) and session_end < tail_start:
+            data = svc.download_stock_data(symbol, session_end, now, "1m")
+        if data is None or data.empty:
+            print(f"  {symbol}: no recent print")
+            return None
+
+        curr = round(float(data['close'].iloc[-1]), 2)
+        chg  = round(curr - prev, 2)
+        pct  = round((chg / prev) * 100, 2)
+
+        return {'symbol': symbol, 'sector': sector,
+                'prev_close': prev, 'curr_price': curr,
+                'change': chg, 'change_pct': pct}
+
     # ── 3. Bar chart ──────────────────────────────────────────────────────────────
 
     def plot_sector_chart(self, df: pd.DataFrame, out_path: str = "sector_performance.png"):
@@ -260,21 +379,8 @@ class SectorPerformance:
             (str(red_count), RED),
         ]
 
-        # reserve title space/position, then overlay colored segments at that anchor
-        title_obj = ax.set_title(' ', loc='left', pad=14, fontsize=8, fontweight='normal')
-        fig.canvas.draw()
-        renderer = fig.canvas.get_renderer()
-        title_transform = title_obj.get_transform()
-        x0, y0 = title_obj.get_position()
-
-        x = x0
-        for text, color in title_segments:
-            t = ax.text(x, y0, text, transform=title_transform, fontsize=8,
-                        fontweight='normal', color=color,
-                        va=title_obj.get_va(), ha='left')
-            fig.canvas.draw()
-            bbox_axes = t.get_window_extent(renderer=renderer).transformed(title_transform.inverted())
-            x = bbox_axes.x1
+        # one draw: each segment is anchored to the end of the previous one
+        draw_colored_title(ax, title_segments, pad=14, fontsize=8, fontweight='normal')
 
         plt.tight_layout(rect=[0, 0.01, 0.93, 1])
         buf = io.BytesIO()
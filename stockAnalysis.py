@@ -40,6 +40,7 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from matplotlib.lines import Line2D
 from alertManager import AlertManager
+from chartRenderer import chart_fingerprint, draw_candlesticks, get_chart_cache
 
 warnings.filterwarnings('ignore')
 
@@ -49,6 +50,7 @@ from zoneinfo import ZoneInfo
 from flask import Blueprint, request, render_template_string
 
 from dataManager import ServiceManager
+from httpClient import get_http_client
 
 # ---------------------------------------------------------------------------
 # Blueprint
@@ -76,44 +78,19 @@ def _fetch_15m_raw(symbol: str, interval:str = '15m', days: int = 5) -> pd.DataF
     end_ts   = int(datetime.now(timezone.utc).timestamp())
     start_ts = int((datetime.now(timezone.utc) - timedelta(days=days)).timestamp())
 
-    url    = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}"
-    params = {
-        'period1':        start_ts,
-        'period2':        end_ts,
-        'interval':       interval,
-        'includePrePost': 'true',
-    }
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-
-    resp = requests.get(url, params=params, headers=headers, timeout=20)
-    resp.raise_for_status()
-    data   = resp.json()
-    result = data['chart']['result'][0]
-    quotes = result['indicators']['quote'][0]
-
-    ts_arr = np.asarray(result['timestamp'], dtype='int64')
-    df = pd.DataFrame({
-        'unixtime': ts_arr,
-        'open':  np.round(np.asarray(quotes['open'],  dtype='float64'), 2),
-        'high':  np.round(np.asarray(quotes['high'],  dtype='float64'), 2),
-        'low':   np.round(np.asarray(quotes['low'],   dtype='float64'), 2),
-        'close': np.round(np.asarray(quotes['close'], dtype='float64'), 2),
-    })
-    df.dropna(inplace=True)
-    df.reset_index(drop=True, inplace=True)
-
-    # Build tz-aware index in ET
-    ts_et = (
-        pd.to_datetime(df['unixtime'], unit='s')
-        .dt.tz_localize('UTC')
-        .dt.tz_convert('America/New_York')
-    )
-    df.index      = ts_et
-    df.index.name = 'timestamp'
+    # Served from ServiceManager's rolling bar store — after the first call
+    # only bars newer than the last cached one are requested from Yahoo.
+    raw = _objMgr.download_stock_data_incremental(symbol, start_ts, end_ts, interval)
+    if raw is None:
+        raise requests.exceptions.HTTPError(f"No chart data returned for {symbol} ({interval})")
+
+    # tz-aware ET index comes from the store; prices back to float64
+    df = raw[['unixtime', 'open', 'high', 'low', 'close']].astype('float64').round(2)
+    df['unixtime'] = raw['unixtime'].astype('int64')
+    del raw
 
-    # Derive date/time columns from the DatetimeIndex after it is set.
-    # Using df.index (not the detached ts_et Series) guarantees alignment
-    # and always produces proper Python datetime.date objects — never floats.
+    # Derive date/time columns from the DatetimeIndex.
+    # Using df.index guarantees alignment and always produces proper Python datetime.date objects — never floats.
     df['rec_dt'] = pd.Series(df.index.date, index=df.index)
     df['hour']   = df.index.hour
     df['minute'] = df.index.minute
@@ -269,14 +246,8 @@ def _build_chart(today_df: pd.DataFrame, levels: dict, symbol: str) :
 
     # ---- Candlestick bars ----
     bar_w = 0.6
-    for i, row in df.iterrows():
-        o, h, l, c = float(row['open']), float(row['high']), float(row['low']), float(row['close'])
-        color = GREEN if c >= o else RED
-        # body
-        ax_candle.bar(xs[i], abs(c - o), bottom=min(o, c), width=bar_w,
-                      color=color, linewidth=0, zorder=3)
-        # wick
-        ax_candle.plot([xs[i], xs[i]], [l, h], color=color, lw=0.9, zorder=2)
+    draw_candlesticks(ax_candle, xs, df['open'], df['high'], df['low'], df['close'],
+                      width=bar_w, up_color=GREEN, down_color=RED, wick_width=0.9, zorder=2)
 
     # ---- Horizontal level lines ----
     level_styles = {
@@ -552,19 +523,26 @@ def stock_analysis():
         # 6. Last trading day's bars — for chart + table
         today_df = indicator_df[(indicator_df['rec_dt'] == today) & (indicator_df['hour'] >= 7)].copy()
 
-        # 7. Build chart image
-        result = _build_chart(today_df, levels, symbol)
-        chart_b64 = ""
-        if result is not None:
+        # 7. Build chart image (cached until the last bar or the levels change)
+        def _render():
+          result = _build_chart(today_df, levels, symbol)
+          if result is None:
+            return None
           image_buffer, rsitrendval, macdtrendval = result
+          return image_buffer, {'rsitrendval': rsitrendval, 'macdtrendval': macdtrendval}
+
+        chart_key = (symbol, inputinterval, 'stockAnalysis',
+                     chart_fingerprint(today_df, extra=tuple(sorted(levels.items()))))
+        chart = get_chart_cache().get_or_render(chart_key, _render)
+        chart_b64 = ""
+        if chart is not None:
+          rsitrendval, macdtrendval = chart.meta['rsitrendval'], chart.meta['macdtrendval']
           if ( "bullish" in rsitrendval or "bullish" in macdtrendval or "bearish" in macdtrendval or "bearish" in rsitrendval):
             altMgr = AlertManager()
-            altMgr.send_photo_alert(image_buffer)
+            altMgr.send_photo_alert(chart.buffer())
             del altMgr
-          image_buffer.seek(0)
-          chart_b64 = base64.b64encode(image_buffer.getvalue()).decode('utf-8')
-          image_buffer.close()
-          del image_buffer
+          chart_b64 = chart.b64
+          del chart
 
         del raw_df, indicator_df, today_df
         gc.collect()
@@ -6,12 +6,110 @@ import matplotlib.pyplot as plt
 import matplotlib
 matplotlib.use('Agg')  # Use Agg backend for non-interactive plotting
 from matplotlib.patches import Rectangle
+from chartRenderer import draw_candlesticks
 from datetime import datetime, timedelta
+import functools
 import warnings
 import io
 import base64
 warnings.filterwarnings('ignore')
 
+# Market hours (Eastern Time, minutes since midnight)
+# Pre-market: 4:00 AM - 9:30 AM ET
+# Regular: 9:30 AM - 4:00 PM ET
+# After-hours: 4:00 PM - 8:00 PM ET
+SESSION_BOUNDS       = np.array([4 * 60, 9 * 60 + 30, 16 * 60, 20 * 60])
+SESSION_CATEGORIES   = ['Pre-Market', 'Regular', 'After-Hours', 'Closed']
+# searchsorted bucket -> category code; both ends of the day are 'Closed'
+SESSION_BUCKET_CODES = np.array([3, 0, 1, 2, 3], dtype='int8')
+
+def wma(values, period):
+    """Linearly weighted moving average (weights 1..period, newest heaviest)
+    as one convolution; the first period-1 entries are NaN, as are windows
+    containing NaN, matching rolling(period).apply(np.average, weights)."""
+    values = np.asarray(values, dtype='float64')
+    out = np.full(len(values), np.nan)
+    if period <= 0 or len(values) < period:
+        return out
+    weights = np.arange(period, 0, -1, dtype='float64') / (period * (period + 1) / 2)
+    out[period - 1:] = np.convolve(values, weights, mode='valid')
+    return out
+
+def hull_ma(values, period, last_only=False):
+    """Hull moving average WMA(2*WMA(n/2) - WMA(n), sqrt(n)).  With
+    last_only=True only the tail window that feeds the final value is
+    touched and a scalar is returned."""
+    values = np.asarray(values, dtype='float64')
+    sqrt_period = int(np.sqrt(period))
+    if last_only:
+        values = values[-(period + sqrt_period - 1):]
+    hull = wma(2 * wma(values, period // 2) - wma(values, period), sqrt_period)
+    if last_only:
+        return hull[-1] if len(hull) else np.nan
+    return hull
+
+def volume_profile(lows, highs, volumes, bins, split_volume=True):
+    """Volume per price bin over equal-width bins spanning min(lows)..max(highs).
+
+    Each bar touches the bins [lo, hi] its low-high range overlaps (edges
+    inclusive), found with searchsorted on the bin edges; its volume is
+    added over that run with one difference array, so the cost is
+    O(bars + bins).  Returns (edges, volume_per_bin), or None when there is
+    no priced bar.
+    """
+    valid = ~(np.isnan(lows) | np.isnan(highs))
+    if not valid.any() or bins < 1:
+        return None
+    lows, highs, volumes = lows[valid], highs[valid], volumes[valid]
+    edges = np.linspace(lows.min(), highs.max(), bins + 1)
+    
+    lo = np.searchsorted(edges[1:], lows, side='left')
+    hi = np.searchsorted(edges[:-1], highs, side='right') - 1
+    touched = hi >= lo
+    lo, hi, volumes = lo[touched], hi[touched], volumes[touched]
+    if split_volume:
+        volumes = volumes / (hi - lo + 1)
+    
+    diff = (np.bincount(lo, weights=volumes, minlength=bins + 1)
+            - np.bincount(hi + 1, weights=volumes, minlength=bins + 1))
+    bin_volume = np.cumsum(diff[:bins])
+    # Fractional shares can leave rounding residue in bins no bar touches
+    coverage = np.cumsum(np.bincount(lo, minlength=bins + 1) - np.bincount(hi + 1, minlength=bins + 1))[:bins]
+    bin_volume[coverage == 0] = 0.0
+    return edges, bin_volume
+
+def value_area(bin_volume, pct=0.70):
+    """(low_bin, high_bin) of the value area: start at the point of control
+    and keep adding whichever neighbouring bin holds more volume until pct
+    of the total is covered.  (None, None) for an empty profile."""
+    total = bin_volume.sum()
+    if total <= 0:
+        return None, None
+    low = high = int(np.argmax(bin_volume))
+    covered = bin_volume[low]
+    while covered < pct * total and (low > 0 or high < len(bin_volume) - 1):
+        below = bin_volume[low - 1] if low > 0 else -1.0
+        above = bin_volume[high + 1] if high < len(bin_volume) - 1 else -1.0
+        if above >= below:
+            high += 1
+            covered += above
+        else:
+            low -= 1
+            covered += below
+    return low, high
+
+def _memoized_level(method):
+    """Compute a level family once per instance; the cached result is
+    dropped as soon as self.data or self.current_price is replaced."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        cache = self._level_cache()
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        if key not in cache:
+            cache[key] = method(self, *args, **kwargs)
+        return cache[key]
+    return wrapper
+
 class SupportResistanceByInputInterval:
     def __init__(self, symbol, interval, days_back=3):
         """
@@ -31,6 +129,8 @@ class SupportResistanceByInputInterval:
         self.interval = interval
         self.data = None
         self.current_price = None
+        self._date_index = None
+        self._levels = None
         
     def fetch_data(self, include_premarket=True):
         """Fetch stock data for recent days including pre-market"""
@@ -72,12 +172,14 @@ class SupportResistanceByInputInterval:
             self.data = self.data[self.data.index >= cutoff_date]
             # Add session type classification
             self.data = self.classify_trading_sessions()
+            self.build_date_index()
             self.current_price = self.data['Close'].iloc[-1]
             
             # Count different session types
-            regular_bars = len(self.data[self.data['Session'] == 'Regular'])
-            premarket_bars = len(self.data[self.data['Session'] == 'Pre-Market'])
-            afterhours_bars = len(self.data[self.data['Session'] == 'After-Hours'])
+            session_counts = self.data['Session'].value_counts()
+            regular_bars = session_counts['Regular']
+            premarket_bars = session_counts['Pre-Market']
+            afterhours_bars = session_counts['After-Hours']
             
             print(f"Fetched {len(self.data)} total {self.interval} bars for {self.symbol}")
             print(f"  - Regular Hours: {regular_bars} bars")
@@ -96,64 +198,74 @@ class SupportResistanceByInputInterval:
         
         # Convert to Eastern Time for US market hours
         if data_with_sessions.index.tz is None:
-            import pytz
-            data_with_sessions.index = pytz.timezone('America/New_York').localize(data_with_sessions.index)
+            data_with_sessions.index = data_with_sessions.index.tz_localize('America/New_York')
         else:
             data_with_sessions.index = data_with_sessions.index.tz_convert('America/New_York')
         
-        # Define market hours (Eastern Time)
-        # Pre-market: 4:00 AM - 9:30 AM ET
-        # Regular: 9:30 AM - 4:00 PM ET  
-        # After-hours: 4:00 PM - 8:00 PM ET
-        
-        sessions = []
-        for timestamp in data_with_sessions.index:
-            hour = timestamp.hour
-            minute = timestamp.minute
-            time_in_minutes = hour * 60 + minute
-            
-            # Convert to minutes since midnight
-            premarket_start = 4 * 60  # 4:00 AM
-            regular_start = 9 * 60 + 30  # 9:30 AM
-            regular_end = 16 * 60  # 4:00 PM
-            afterhours_end = 20 * 60  # 8:00 PM
-            
-            if premarket_start <= time_in_minutes < regular_start:
-                sessions.append('Pre-Market')
-            elif regular_start <= time_in_minutes < regular_end:
-                sessions.append('Regular')
-            elif regular_end <= time_in_minutes < afterhours_end:
-                sessions.append('After-Hours')
-            else:
-                sessions.append('Closed')  # Outside trading hours
-        
-        data_with_sessions['Session'] = sessions
+        # Bucket minutes-since-midnight against the session boundaries in one
+        # pass; searchsorted gives 0 (before 4:00) .. 4 (after 20:00)
+        time_in_minutes = data_with_sessions.index.hour * 60 + data_with_sessions.index.minute
+        buckets = np.searchsorted(SESSION_BOUNDS, np.asarray(time_in_minutes), side='right')
+        data_with_sessions['Session'] = pd.Categorical.from_codes(
+            SESSION_BUCKET_CODES[buckets], categories=SESSION_CATEGORIES)
         return data_with_sessions
     
+    def build_date_index(self):
+        """Precompute the row range of every trading date in self.data.
+
+        Bars are time-ordered, so each date is one contiguous run of rows;
+        the index is (dates, starts) with rows of dates[i] at
+        starts[i]:starts[i + 1].  Rebuilt automatically whenever self.data
+        is replaced.
+        """
+        data_dates = np.asarray(self.data.index.date)
+        n = len(data_dates)
+        if n == 0:
+            starts = np.array([0])
+        else:
+            starts = np.r_[0, np.flatnonzero(data_dates[1:] != data_dates[:-1]) + 1, n]
+        self._date_index = (self.data, data_dates[starts[:-1]], starts)
+        return self._date_index
+
+    def _trading_dates(self):
+        """(dates, starts) for the current self.data (see build_date_index)."""
+        if self._date_index is None or self._date_index[0] is not self.data:
+            self.build_date_index()
+        return self._date_index[1], self._date_index[2]
+
+    def _date_rows(self, pos):
+        """Rows of the pos-th trading date (negative pos counts from the end)."""
+        dates, starts = self._trading_dates()
+        pos = range(len(dates))[pos]
+        return self.data.iloc[starts[pos]:starts[pos + 1]]
+
+    def _level_cache(self):
+        """Per-instance results of the @_memoized_level methods, valid for
+        the current self.data / self.current_price objects."""
+        if self._levels is None or self._levels[0] is not self.data or self._levels[1] is not self.current_price:
+            self._levels = (self.data, self.current_price, {})
+        return self._levels[2]
+
+    def invalidate_levels(self):
+        """Forget memoized levels, e.g. after modifying self.data in place."""
+        self._levels = None
+        self._date_index = None
+
+    @_memoized_level
     def session_levels(self):
         """Calculate key levels for current trading session"""
         if self.data is None:
             return None
             
         try:
-            # Get today's session data - handle timezone issues
+            dates, starts = self._trading_dates()
+            if len(dates) == 0:
+                return None
+
+            # Today's session, or the most recent one if today has no bars yet
             today = datetime.now().date()
-            
-            # Convert index to date for comparison
-            if hasattr(self.data.index, 'date'):
-                data_dates = self.data.index.date
-            else:
-                data_dates = [d.date() for d in self.data.index]
-            
-            today_mask = [d == today for d in data_dates]
-            today_data = self.data[today_mask]
-            
-            if today_data.empty:
-                # Use most recent session if today's data not available
-                latest_date = data_dates[-1] if data_dates else None
-                if latest_date:
-                    latest_mask = [d == latest_date for d in data_dates]
-                    today_data = self.data[latest_mask]
+            today_pos = np.flatnonzero(dates == today)
+            today_data = self._date_rows(today_pos[0] if len(today_pos) else -1)
             
             if not today_data.empty:
                 session_open = today_data['Open'].iloc[0]
@@ -177,29 +289,17 @@ class SupportResistanceByInputInterval:
             
         return None
     
+    @_memoized_level
     def previous_session_levels(self):
         """Get previous trading session's key levels"""
         if self.data is None:
             return None
             
         try:
-            # Get unique trading dates - handle timezone issues
-            if hasattr(self.data.index, 'date'):
-                dates = sorted(list(set(self.data.index.date)))
-            else:
-                dates = sorted(list(set([d.date() for d in self.data.index])))
+            dates, starts = self._trading_dates()
             
             if len(dates) >= 2:
-                prev_date = dates[-2]  # Previous trading day
-                
-                # Create mask for previous date
-                if hasattr(self.data.index, 'date'):
-                    data_dates = self.data.index.date
-                else:
-                    data_dates = [d.date() for d in self.data.index]
-                
-                prev_mask = [d == prev_date for d in data_dates]
-                prev_data = self.data[prev_mask]
+                prev_data = self._date_rows(-2)  # Previous trading day
                 
                 if not prev_data.empty:
                     return {
@@ -213,6 +313,7 @@ class SupportResistanceByInputInterval:
             
         return None
     
+    @_memoized_level
     def fifteen_min_pivot_points(self):
         """Calculate pivot points using previous session data"""
         prev_session = self.previous_session_levels()
@@ -254,6 +355,7 @@ class SupportResistanceByInputInterval:
             'previous_session': prev_session
         }
     
+    @_memoized_level
     def premarket_analysis(self):
         """Analyze pre-market activity, including gap analysis"""
         if self.data is None:
@@ -289,43 +391,38 @@ class SupportResistanceByInputInterval:
             }
         }
 
+    @_memoized_level
     def real_time_vwap(self):
         """Calculate VWAP for current session and previous sessions"""
         if self.data is None:
             return None
             
         vwap_levels = {}
-        
-        # Group by trading date - handle timezone issues
-        if hasattr(self.data.index, 'date'):
-            unique_dates = set(self.data.index.date)
-            data_dates = self.data.index.date
-        else:
-            unique_dates = set([d.date() for d in self.data.index])
-            data_dates = [d.date() for d in self.data.index]
-        
-        for date in sorted(unique_dates):
-            # Create mask for this date
-            date_mask = [d == date for d in data_dates]
-            day_data = self.data[date_mask]
-            
-            if not day_data.empty and day_data['Volume'].sum() > 0:
-                # Typical price for VWAP calculation
-                typical_price = (day_data['High'] + day_data['Low'] + day_data['Close']) / 3
-                
-                # Calculate cumulative VWAP for the session
-                cum_volume = day_data['Volume'].cumsum()
-                cum_pv = (typical_price * day_data['Volume']).cumsum()
-                session_vwap = cum_pv / cum_volume
-                
+        dates, starts = self._trading_dates()
+        if len(dates) == 0:
+            return vwap_levels
+        
+        # Cumulative VWAP of every session in one grouped pass
+        session_codes = np.repeat(np.arange(len(dates)), np.diff(starts))
+        typical_price = (self.data['High'] + self.data['Low'] + self.data['Close']) / 3
+        cum_volume = self.data['Volume'].groupby(session_codes).cumsum()
+        cum_pv = (typical_price * self.data['Volume']).groupby(session_codes).cumsum()
+        session_vwap = cum_pv / cum_volume
+        day_volume = np.add.reduceat(self.data['Volume'].to_numpy(), starts[:-1])
+        
+        today = datetime.now().date()
+        for i, date in enumerate(dates):
+            if day_volume[i] > 0:
+                vwap_series = session_vwap.iloc[starts[i]:starts[i + 1]]
                 vwap_levels[str(date)] = {
-                    'final_vwap': session_vwap.iloc[-1],
-                    'vwap_series': session_vwap,
-                    'is_current': date == datetime.now().date()
+                    'final_vwap': vwap_series.iloc[-1],
+                    'vwap_series': vwap_series,
+                    'is_current': date == today
                 }
         
         return vwap_levels
     
+    @_memoized_level
     def fifteen_min_swing_levels(self, swing_strength=2):
         """
         Identify swing highs and lows from 15-minute data
@@ -449,6 +546,7 @@ class SupportResistanceByInputInterval:
             }
         }
     
+    @_memoized_level
     def scalping_moving_averages(self):
         """Calculate fast moving averages suitable for scalping"""
         if self.data is None:
@@ -456,32 +554,32 @@ class SupportResistanceByInputInterval:
             
         # Very short-term MAs for 15-min scalping
         periods = [8, 13, 21, 34, 55]  # Fibonacci-based periods
+        closes = self.data['Close'].to_numpy(dtype='float64')
+        
+        # Latest SMA and EMA for every period from one pass over the closes:
+        # SMA is the mean of the tail window, EMA the adjusted (ewm default)
+        # weighted mean with weights (1 - alpha)^age, NaN bars weighted 0
+        valid = ~np.isnan(closes)
+        filled = np.where(valid, closes, 0.0)
+        age = np.arange(len(closes) - 1, -1, -1, dtype='float64')
         
         mas = {}
         emas = {}
         
         for period in periods:
-            if len(self.data) >= period:
+            if len(closes) >= period:
                 # Simple MA
-                ma_value = self.data['Close'].rolling(period).mean().iloc[-1]
-                mas[f'MA_{period}'] = ma_value
+                mas[f'MA_{period}'] = closes[-period:].mean()
                 
                 # Exponential MA (more responsive)
-                ema_value = self.data['Close'].ewm(span=period).mean().iloc[-1]
-                emas[f'EMA_{period}'] = ema_value
+                weights = np.power(1 - 2 / (period + 1), age) * valid
+                emas[f'EMA_{period}'] = weights @ filled / weights.sum()
         
         # Hull Moving Average for even faster signals
         if len(self.data) >= 16:
-            def hull_ma(prices, period):
-                wma1 = prices.rolling(period//2).apply(lambda x: np.average(x, weights=range(1, len(x)+1)))
-                wma2 = prices.rolling(period).apply(lambda x: np.average(x, weights=range(1, len(x)+1)))
-                diff = 2 * wma1 - wma2
-                hull = diff.rolling(int(np.sqrt(period))).apply(lambda x: np.average(x, weights=range(1, len(x)+1)))
-                return hull.iloc[-1]
-            
             try:
-                hull_9 = hull_ma(self.data['Close'], 9)
-                hull_21 = hull_ma(self.data['Close'], 21)
+                hull_9 = hull_ma(closes, 9, last_only=True)
+                hull_21 = hull_ma(closes, 21, last_only=True)
                 
                 return {
                     'simple_mas': mas,
@@ -499,44 +597,52 @@ class SupportResistanceByInputInterval:
             'exponential_mas': emas
         }
     
-    def volume_profile_15min(self, profile_bars=96):  # 24 hours of 15-min bars
-        """Calculate volume profile for recent 15-minute data"""
+    @_memoized_level
+    def volume_profile_15min(self, profile_bars=96, bins=19, value_area_pct=0.70, split_volume=True):  # 24 hours of 15-min bars
+        """Calculate volume profile for recent 15-minute data
+        
+        Args:
+            profile_bars (int): Number of most recent bars in the profile window
+            bins (int): Number of equal-width price bins between the window's low and high
+            value_area_pct (float): Share of volume the value area (VAL..VAH) must hold
+            split_volume (bool): Spread each bar's volume evenly over the bins its
+                high-low range touches; False credits the full volume to every
+                touched bin (the original behaviour)
+        """
         if self.data is None:
             return None
             
         # Use recent data for volume profile
         recent_data = self.data.tail(profile_bars)
+        lows = recent_data['Low'].to_numpy(dtype='float64')
+        highs = recent_data['High'].to_numpy(dtype='float64')
+        volumes = np.nan_to_num(recent_data['Volume'].to_numpy(dtype='float64'))
+        
+        profile = volume_profile(lows, highs, volumes, bins, split_volume)
+        if profile is None:
+            return {'high_volume_nodes': [], 'point_of_control': None,
+                    'value_area_high': None, 'value_area_low': None}
+        price_bins, bin_volume = profile
+        
+        def node(i):
+            return {
+                'price': (price_bins[i] + price_bins[i + 1]) / 2,
+                'volume': bin_volume[i],
+                'price_range': (price_bins[i], price_bins[i + 1])
+            }
         
-        # Create price bins
-        price_min = recent_data['Low'].min()
-        price_max = recent_data['High'].max()
-        num_bins = 20
-        price_bins = np.linspace(price_min, price_max, num_bins)
-        
-        volume_profile = []
-        
-        for i in range(len(price_bins) - 1):
-            bin_low = price_bins[i]
-            bin_high = price_bins[i + 1]
-            bin_mid = (bin_low + bin_high) / 2
-            
-            # Volume in this price range
-            mask = (recent_data['Low'] <= bin_high) & (recent_data['High'] >= bin_low)
-            volume_in_bin = recent_data.loc[mask, 'Volume'].sum()
-            
-            if volume_in_bin > 0:
-                volume_profile.append({
-                    'price': bin_mid,
-                    'volume': volume_in_bin,
-                    'price_range': (bin_low, bin_high)
-                })
+        # High volume nodes (HVN): busiest bins first, ties in price order
+        ranked = np.argsort(-bin_volume, kind='stable')
+        ranked = ranked[bin_volume[ranked] > 0]
+        high_volume_nodes = [node(i) for i in ranked[:5]]
         
-        # Sort by volume and get high volume nodes (HVN)
-        volume_profile.sort(key=lambda x: x['volume'], reverse=True)
+        val_bin, vah_bin = value_area(bin_volume, value_area_pct)
         
         return {
-            'high_volume_nodes': volume_profile[:5],
-            'point_of_control': volume_profile[0] if volume_profile else None
+            'high_volume_nodes': high_volume_nodes,
+            'point_of_control': high_volume_nodes[0] if high_volume_nodes else None,
+            'value_area_high': price_bins[vah_bin + 1] if vah_bin is not None else None,
+            'value_area_low': price_bins[val_bin] if val_bin is not None else None
         }
     
     def calculate_all_15min_levels(self):
@@ -835,7 +941,7 @@ class SupportResistanceByInputInterval:
         # Chart formatting
         ax1.set_title(f'{self.symbol} - {self.interval} Candlestick Chart with Support/Resistance\n'
                      f'Current Price: ${self.current_price:.2f} | '
-                     f'Time: {datetime.now().strftime("%Y-%m-%d %H:%M")}', 
+                     f'Last bar: {times[-1].strftime("%Y-%m-%d %H:%M")}', 
                      fontsize=9, pad=20)
         ax1.set_ylabel('Price ($)', fontsize=9)
         ax1.legend(bbox_to_anchor=(1.02, 1), loc='upper left', fontsize=11)
@@ -871,48 +977,12 @@ class SupportResistanceByInputInterval:
         else:
             candle_width = timedelta(minutes=12)  # Default for 15-min chart
         
-        for i in range(len(times)):
-            time = times[i]
-            open_price = opens[i]
-            high_price = highs[i]
-            low_price = lows[i]
-            close_price = closes[i]
-            
-            # Determine candle color
-            if close_price >= open_price:
-                # Bullish candle (green)
-                body_color = 'green'
-                edge_color = 'darkgreen'
-                alpha = 0.8
-            else:
-                # Bearish candle (red)
-                body_color = 'red'
-                edge_color = 'darkred'
-                alpha = 0.8
-            
-            # Draw high-low line (wick)
-            ax.plot([time, time], [low_price, high_price], 
-                   color='black', linewidth=1, alpha=0.8, zorder=2)
-            
-            # Draw candle body
-            body_height = abs(close_price - open_price)
-            body_bottom = min(open_price, close_price)
-            
-            if body_height > 0:
-                # Regular candle with body
-                rectangle = Rectangle((time - candle_width/2, body_bottom), 
-                                    candle_width, body_height,
-                                    facecolor=body_color, 
-                                    edgecolor=edge_color,
-                                    alpha=alpha,
-                                    linewidth=1,
-                                    zorder=3)
-                ax.add_patch(rectangle)
-            else:
-                # Doji candle (open == close)
-                ax.plot([time - candle_width/2, time + candle_width/2], 
-                       [close_price, close_price], 
-                       color='black', linewidth=2, zorder=3)
+        # Bullish candles green, bearish red; black wicks and doji ticks
+        draw_candlesticks(ax, times, opens, highs, lows, closes, width=candle_width,
+                          up_color='green', down_color='red',
+                          up_edge='darkgreen', down_edge='darkred', edge_width=1,
+                          body_alpha=0.8, wick_color='black', wick_width=1, wick_alpha=0.8,
+                          doji_color='black', doji_width=2, zorder=2)
         
         # Set axis limits
         ax.set_xlim(times[0] - candle_width, times[-1] + candle_width)
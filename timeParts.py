@@ -0,0 +1,85 @@
+"""
+timeParts.py
+============
+Month / day / hour / minute of unix timestamps in America/New_York, derived
+with integer arithmetic instead of per-row datetime formatting.
+
+  • The UTC offset is looked up once per distinct UTC hour (DST switches on
+    an hour boundary) and memoised, so a 4-day download costs ~100 zoneinfo
+    lookups the first time and none afterwards.
+  • Parts come back as small integers.  The legacy zero-padded string form
+    ('05', '13', ...) is a Categorical built from those integers: each
+    distinct value is formatted once, and per-row strings only materialise
+    when a row is read.
+  • New York offsets are whole hours, so minute-of-hour filters can run on
+    the epoch directly: `minute_mask(unixtime, 15)` == minute in {0,15,30,45}.
+
+Usage:
+    from timeParts import time_parts, padded_category, minute_mask
+    parts = time_parts(df['unixtime'])
+    df['hour'] = padded_category(parts.hour)
+"""
+
+from collections import namedtuple
+from datetime import datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+_ET     = ZoneInfo("America/New_York")
+_PADDED = np.array([f"{i:02d}" for i in range(100)], dtype=object)
+
+TimeParts = namedtuple('TimeParts', 'days month day hour minute')
+
+
+@lru_cache(maxsize=1 << 16)
+def _hour_offset(hour):
+    """UTC offset in seconds of New York during UTC hour `hour` (epoch hours)."""
+    return int(datetime.fromtimestamp(hour * 3600, _ET).utcoffset().total_seconds())
+
+
+def ny_offsets(unixtime):
+    """Per-row New York UTC offset in seconds for an array of unix times."""
+    hours = np.asarray(unixtime, dtype='int64') // 3600
+    uniq, inverse = np.unique(hours, return_inverse=True)
+    table = np.fromiter((_hour_offset(h) for h in uniq.tolist()), dtype='int64', count=len(uniq))
+    return table[inverse]
+
+
+def time_parts(unixtime):
+    """TimeParts of local New York time: `days` (local date as days since
+    the epoch, int64) and month/day/hour/minute (int8)."""
+    secs  = np.asarray(unixtime, dtype='int64')
+    local = secs + ny_offsets(secs)
+    days  = local // 86400
+    date  = days.astype('datetime64[D]')
+    first = date.astype('datetime64[M]')
+    return TimeParts(
+        days   = days,
+        month  = (first.astype('int64') % 12 + 1).astype('int8'),
+        day    = ((date - first).astype('int64') + 1).astype('int8'),
+        hour   = (local // 3600 % 24).astype('int8'),
+        minute = (local // 60 % 60).astype('int8'),
+    )
+
+
+def local_dates(days):
+    """datetime.date objects for `days` (as returned in TimeParts.days)."""
+    return np.asarray(days, dtype='int64').astype('datetime64[D]').astype(object)
+
+
+def padded_category(values):
+    """Zero-padded string Categorical ('00'..'99') for small integers — the
+    same values and categories as strftime(...).astype('category')."""
+    values  = np.asarray(values)
+    present = np.unique(values)
+    return pd.Categorical.from_codes(np.searchsorted(present, values),
+                                     categories=pd.Index(_PADDED[present], dtype='str'))
+
+
+def minute_mask(unixtime, step):
+    """True where the minute of the hour is a multiple of `step` (New York
+    offsets are whole hours, so the epoch minute gives the same answer)."""
+    return np.asarray(unixtime, dtype='int64') // 60 % step == 0